@@ -0,0 +1,200 @@
+import struct
+import numpy as np
+
+from audio_render import SAMPLE_DTYPE, encode_wav
+
+# 📼 Sorties compactes : G.711 (μ-law / A-law, 8 bits) dans un WAV, et FLAC (sans perte)
+WAVE_FORMAT_ALAW = 6
+WAVE_FORMAT_MULAW = 7
+
+# Segments G.711 (tables de la référence g711.c)
+_SEG_END_ALAW = np.array([0x1F, 0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF])
+_SEG_END_MULAW = np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF])
+
+_g711_tables = {}
+
+
+def _build_alaw_table():
+    pcm = np.arange(-32768, 32768, dtype=np.int64) >> 3
+    mask = np.where(pcm >= 0, 0xD5, 0x55)
+    pcm = np.where(pcm >= 0, pcm, -pcm - 1)
+    seg = np.searchsorted(_SEG_END_ALAW, pcm)
+    shift = np.where(seg < 2, 1, seg)
+    aval = (np.minimum(seg, 7) << 4) | ((pcm >> shift) & 0xF)
+    aval = np.where(seg >= 8, 0x7F, aval)
+    return (aval ^ mask).astype(np.uint8)
+
+
+def _build_mulaw_table():
+    pcm = np.arange(-32768, 32768, dtype=np.int64) >> 2
+    mask = np.where(pcm < 0, 0x7F, 0xFF)
+    pcm = np.minimum(np.abs(pcm), 8159) + (0x84 >> 2)
+    seg = np.searchsorted(_SEG_END_MULAW, pcm)
+    uval = (np.minimum(seg, 7) << 4) | ((pcm >> (np.minimum(seg, 7) + 1)) & 0xF)
+    uval = np.where(seg >= 8, 0x7F, uval)
+    return (uval ^ mask).astype(np.uint8)
+
+
+def _g711_table(codec):
+    # Une table de 65 536 octets par loi, construite au premier usage
+    table = _g711_tables.get(codec)
+    if table is None:
+        table = _build_mulaw_table() if codec == WAVE_FORMAT_MULAW else _build_alaw_table()
+        _g711_tables[codec] = table
+    return table
+
+
+def lin2ulaw(pcm):
+    """Encode un tableau int16 en μ-law 8 bits (G.711), par simple lecture de table."""
+    return _g711_table(WAVE_FORMAT_MULAW)[pcm.astype(np.int32) + 32768]
+
+
+def lin2alaw(pcm):
+    """Encode un tableau int16 en A-law 8 bits (G.711), par simple lecture de table."""
+    return _g711_table(WAVE_FORMAT_ALAW)[pcm.astype(np.int32) + 32768]
+
+
+def encode_wav_g711(data, codec, frame_rate):
+    """WAV mono G.711 (format 6 = A-law, 7 = μ-law) ; le module `wave` n'écrit que du PCM."""
+    fmt = struct.pack("<HHIIHHH", codec, 1, frame_rate, frame_rate, 1, 8, 0)
+    fact = struct.pack("<I", len(data))
+    pad = b"\x00" if len(data) % 2 else b""
+    body = (
+        b"WAVE"
+        + b"fmt " + struct.pack("<I", len(fmt)) + fmt
+        + b"fact" + struct.pack("<I", len(fact)) + fact
+        + b"data" + struct.pack("<I", len(data)) + bytes(data) + pad
+    )
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+# 🗜️ Encodeur FLAC minimal (mono 16 bits) : prédicteurs fixes d'ordre 0 à 4 + codage de Rice
+FLAC_BLOCK_SIZE = 4096
+_MAX_RICE_PARAMETER = 14
+
+_CRC8_TABLE = []
+_CRC16_TABLE = []
+for _byte in range(256):
+    _crc8 = _byte
+    _crc16 = _byte << 8
+    for _ in range(8):
+        _crc8 = ((_crc8 << 1) ^ 0x07) & 0xFF if _crc8 & 0x80 else (_crc8 << 1) & 0xFF
+        _crc16 = ((_crc16 << 1) ^ 0x8005) & 0xFFFF if _crc16 & 0x8000 else (_crc16 << 1) & 0xFFFF
+    _CRC8_TABLE.append(_crc8)
+    _CRC16_TABLE.append(_crc16)
+
+
+def _crc8(data):
+    crc = 0
+    for byte in data:
+        crc = _CRC8_TABLE[crc ^ byte]
+    return crc
+
+
+def _crc16(data):
+    crc = 0
+    table = _CRC16_TABLE
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ table[(crc >> 8) ^ byte]
+    return crc
+
+
+def _bits(value, count):
+    """Les `count` bits de poids faible de `value`, du plus fort au plus faible (tableau de 0/1)."""
+    return ((value >> np.arange(count - 1, -1, -1)) & 1).astype(np.uint8)
+
+
+def _utf8_number(number):
+    """Numéro de trame codé « UTF-8 » comme l'exige l'en-tête de trame FLAC."""
+    if number < 0x80:
+        return bytes([number])
+    for length, limit in ((2, 0x800), (3, 0x10000), (4, 0x200000), (5, 0x4000000), (6, 0x80000000)):
+        if number < limit:
+            break
+    tail = []
+    for _ in range(length - 1):
+        tail.append(0x80 | (number & 0x3F))
+        number >>= 6
+    return bytes([((0xFF << (8 - length)) & 0xFF) | number] + tail[::-1])
+
+
+def _rice_bits(residual):
+    """Résidu codé en Rice (partition unique) : bits du paramètre puis des valeurs."""
+    folded = (residual << 1) ^ (residual >> 63)  # entiers signés → naturels (zigzag)
+    costs = [int((folded >> k).sum()) + len(folded) * (k + 1) for k in range(_MAX_RICE_PARAMETER + 1)]
+    k = int(np.argmin(costs))
+
+    quotients = folded >> k
+    lengths = quotients + 1 + k
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    bits = np.zeros(int(ends[-1]) if len(ends) else 0, dtype=np.uint8)
+    bits[starts + quotients] = 1  # unaire : q zéros puis un 1
+    if k:
+        positions = (starts + quotients + 1)[:, None] + np.arange(k)
+        bits[positions] = (folded[:, None] >> np.arange(k - 1, -1, -1)) & 1
+
+    # Méthode 00 (paramètre sur 4 bits), ordre de partition 0
+    return np.concatenate((_bits(0, 2), _bits(0, 4), _bits(k, 4), bits))
+
+
+def _encode_frame(block, number):
+    samples = block.astype(np.int64)
+
+    # 🔹 Prédicteur fixe donnant le plus petit résidu
+    best = None
+    for order in range(min(5, len(samples))):
+        residual = np.diff(samples, n=order)
+        cost = int(np.abs(residual).sum())
+        if best is None or cost < best[0]:
+            best = (cost, order, residual)
+    _, order, residual = best
+
+    header = bytearray(b"\xff\xf8")  # synchro, taille de bloc fixe
+    header.append(0x70)  # taille de bloc sur 16 bits en fin d'en-tête, fréquence lue dans STREAMINFO
+    header.append(0x08)  # mono, 16 bits
+    header += _utf8_number(number)
+    header += struct.pack(">H", len(samples) - 1)
+    header.append(_crc8(header))
+
+    # En-tête de sous-trame : bit nul, type FIXED d'ordre `order` (001xxx), pas de bits perdus
+    subframe = [_bits(0b001000 | order, 7), _bits(0, 1)]
+    warmup = [_bits(int(value) & 0xFFFF, 16) for value in samples[:order]]
+    bits = np.concatenate(subframe + warmup + [_rice_bits(residual)])
+
+    frame = bytes(header) + np.packbits(bits).tobytes()  # complété par des zéros jusqu'à l'octet
+    return frame + struct.pack(">H", _crc16(frame))
+
+
+def encode_flac(pcm, frame_rate):
+    """Encode un tableau int16 mono en fichier FLAC complet (en mémoire)."""
+    pcm = np.asarray(pcm, dtype=SAMPLE_DTYPE)
+    streaminfo = struct.pack(">HH", FLAC_BLOCK_SIZE, FLAC_BLOCK_SIZE) + bytes(6)  # tailles de trame inconnues
+    streaminfo += (
+        (frame_rate << 44) | (0 << 41) | (15 << 36) | len(pcm)  # fréquence, 1 canal, 16 bits, nb d'échantillons
+    ).to_bytes(8, "big")
+    streaminfo += bytes(16)  # MD5 non calculé (autorisé par le format)
+
+    out = [b"fLaC", bytes([0x80]) + len(streaminfo).to_bytes(3, "big"), streaminfo]
+    for number, start in enumerate(range(0, len(pcm), FLAC_BLOCK_SIZE)):
+        out.append(_encode_frame(pcm[start:start + FLAC_BLOCK_SIZE], number))
+    return b"".join(out)
+
+
+# 🎛️ Valeurs acceptées pour l'option "audio_output"
+AUDIO_OUTPUTS = ("wav", "raw", "mulaw", "alaw", "flac")
+
+
+def encode_audio(frames, audio_output, frame_rate):
+    """Encode des trames PCM mono 16 bits dans le format de sortie demandé."""
+    if audio_output in (None, "wav", "raw"):
+        return encode_wav(frames, frame_rate=frame_rate)
+
+    pcm = np.frombuffer(frames, dtype=SAMPLE_DTYPE)
+    if audio_output == "mulaw":
+        return encode_wav_g711(lin2ulaw(pcm).tobytes(), WAVE_FORMAT_MULAW, frame_rate)
+    if audio_output == "alaw":
+        return encode_wav_g711(lin2alaw(pcm).tobytes(), WAVE_FORMAT_ALAW, frame_rate)
+    if audio_output == "flac":
+        return encode_flac(pcm, frame_rate)
+    raise ValueError(f"Sortie audio inconnue : {audio_output!r} (attendu : {', '.join(AUDIO_OUTPUTS)})")
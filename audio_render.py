@@ -0,0 +1,233 @@
+import io
+import wave
+import struct
+import numpy as np
+
+# 🎚️ Format PCM canonique des sons de la banque : mono, 16 bits, 44,1 kHz
+SAMPLE_DTYPE = np.dtype("<i2")
+CANONICAL_CHANNELS = 1
+CANONICAL_SAMPLE_WIDTH = 2
+CANONICAL_FRAME_RATE = 44100
+
+
+def sample_array(sample):
+    """Vue NumPy int16 (lecture seule, sans copie) sur le PCM d'un Sample."""
+    return np.frombuffer(sample.data, dtype=SAMPLE_DTYPE)
+
+
+def pcm_to_int16(data, sample_width):
+    """Convertit des octets PCM (8, 16, 24 ou 32 bits, format WAV) en int16."""
+    if sample_width == 1:
+        # WAV 8 bits : entiers non signés centrés sur 128
+        return ((np.frombuffer(data, dtype=np.uint8).astype(np.int16) - 128) << 8).astype(SAMPLE_DTYPE)
+    if sample_width == 2:
+        return np.frombuffer(data, dtype=SAMPLE_DTYPE)
+    if sample_width == 3:
+        # On garde les 2 octets de poids fort de chaque échantillon 24 bits
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+        return np.ascontiguousarray(raw[:, 1:]).view(SAMPLE_DTYPE).ravel()
+    if sample_width == 4:
+        return (np.frombuffer(data, dtype="<i4") >> 16).astype(SAMPLE_DTYPE)
+    raise ValueError(f"Largeur d'échantillon non gérée : {sample_width} octets")
+
+
+def to_canonical(data, channels, sample_width, frame_rate):
+    """Convertit du PCM quelconque au format canonique (mono, 16 bits, 44,1 kHz)."""
+    pcm = pcm_to_int16(data, sample_width)
+
+    if channels > 1:
+        # 🔹 Mixage en mono : moyenne des canaux
+        frames = pcm[:len(pcm) - len(pcm) % channels].reshape(-1, channels)
+        pcm = np.rint(frames.mean(axis=1)).astype(SAMPLE_DTYPE)
+
+    if frame_rate != CANONICAL_FRAME_RATE and len(pcm):
+        # 🔹 Rééchantillonnage par interpolation linéaire
+        n_out = int(round(len(pcm) * CANONICAL_FRAME_RATE / frame_rate))
+        positions = np.arange(n_out) * (frame_rate / CANONICAL_FRAME_RATE)
+        pcm = np.rint(np.interp(positions, np.arange(len(pcm)), pcm)).astype(SAMPLE_DTYPE)
+
+    return np.ascontiguousarray(pcm, dtype=SAMPLE_DTYPE)
+
+
+# 🔻 Filtre anti-repliement des sorties sous-échantillonnées (sinus cardinal fenêtré)
+RESAMPLE_FILTER_HALF_WIDTH = 32
+
+
+def resample(pcm, src_rate, dst_rate):
+    """Rééchantillonne un tableau int16 mono : passe-bas avant sous-échantillonnage, puis interpolation linéaire."""
+    if src_rate == dst_rate or not len(pcm):
+        return pcm
+
+    signal = pcm.astype(np.float64)
+    if dst_rate < src_rate:
+        cutoff = 0.45 * dst_rate / src_rate  # Un peu sous la nouvelle fréquence de Nyquist
+        taps = np.arange(-RESAMPLE_FILTER_HALF_WIDTH, RESAMPLE_FILTER_HALF_WIDTH + 1)
+        kernel = 2 * cutoff * np.sinc(2 * cutoff * taps) * np.blackman(len(taps))
+        signal = np.convolve(signal, kernel / kernel.sum(), mode="same")
+
+    n_out = int(round(len(pcm) * dst_rate / src_rate))
+    positions = np.arange(n_out) * (src_rate / dst_rate)
+    resampled = np.interp(positions, np.arange(len(signal)), signal)
+    return np.clip(np.rint(resampled), -32768, 32767).astype(SAMPLE_DTYPE)
+
+
+# 🎭 Étirement temporel WSOLA : fenêtres de 25 ms recouvertes à moitié, calées par corrélation
+STRETCH_FRAME_MS = 25
+
+
+def time_stretch(pcm, stretch, frame_rate=CANONICAL_FRAME_RATE):
+    """Multiplie la durée d'un tableau int16 mono par `stretch` sans changer la hauteur (WSOLA)."""
+    if stretch == 1 or not len(pcm):
+        return pcm
+
+    frame = 2 * max(1, ms_to_frames(STRETCH_FRAME_MS, frame_rate) // 2)
+    hop_out = frame // 2
+    hop_in = hop_out / stretch
+    tolerance = hop_out // 2  # Décalage max accepté pour garder la continuité de phase
+    n_out = int(round(len(pcm) * stretch))
+
+    # Marges : fenêtres centrées dès le début, et recherche possible au-delà de la fin
+    lead = frame
+    signal = np.pad(pcm.astype(np.float64), (lead, int(frame / stretch) + 2 * frame + tolerance))
+    window = np.hanning(frame)
+    out = np.zeros(n_out + 2 * frame)
+    norm = np.zeros_like(out)
+
+    previous = None
+    for k in range(int(np.ceil((n_out + hop_out) / hop_out)) + 1):
+        start = lead - hop_out + int(round(k * hop_in))
+        if previous is not None:
+            # 🔹 Segment le plus ressemblant à la suite naturelle du segment précédent
+            natural = signal[previous + hop_out:previous + hop_out + frame]
+            region = signal[start - tolerance:start + tolerance + frame]
+            start += int(np.argmax(np.correlate(region, natural, mode="valid"))) - tolerance
+        out[k * hop_out:k * hop_out + frame] += signal[start:start + frame] * window
+        norm[k * hop_out:k * hop_out + frame] += window
+        previous = start
+
+    stretched = out[hop_out:hop_out + n_out] / np.maximum(norm[hop_out:hop_out + n_out], 1e-3)
+    return np.clip(np.rint(stretched), -32768, 32767).astype(SAMPLE_DTYPE)
+
+
+def pitch_shift(pcm, semitones, stretch=1.0, frame_rate=CANONICAL_FRAME_RATE):
+    """Transpose de `semitones` demi-tons et multiplie la durée par `stretch` (étirement puis rééchantillonnage)."""
+    ratio = 2 ** (semitones / 12)
+    if ratio == 1:
+        return time_stretch(pcm, stretch, frame_rate)
+    stretched = time_stretch(pcm, stretch * ratio, frame_rate)
+    return resample(stretched, frame_rate * ratio, frame_rate)
+
+
+def peak_dbfs(pcm):
+    """Niveau crête d'un tableau int16, en dBFS (-inf pour un silence)."""
+    if not len(pcm):
+        return float("-inf")
+    peak = int(np.abs(pcm.astype(np.int32)).max())
+    return float(20 * np.log10(peak / 32768)) if peak else float("-inf")
+
+
+def concat_sample_groups(groups):
+    """Concatène plusieurs listes de Sample mono (une par phrase) dans un seul tableau int16 préalloué."""
+    out = np.empty(sum(s.nframes for samples in groups for s in samples), dtype=SAMPLE_DTYPE)
+
+    pos = 0
+    for samples in groups:
+        for sample in samples:
+            out[pos:pos + sample.nframes] = sample_array(sample)
+            pos += sample.nframes
+
+    return out
+
+
+def ms_to_frames(ms, frame_rate=CANONICAL_FRAME_RATE):
+    """Convertit une durée en millisecondes en nombre de trames."""
+    return int(round(ms * frame_rate / 1000))
+
+
+def _ramp(n):
+    # Rampe linéaire de 0 à 1 ; ramp + (1 - ramp) = 1 sur toute la zone de fondu
+    return (np.arange(n, dtype=np.float32) + 0.5) / n
+
+
+def mix_sample_groups(groups, word_gap=0, phrase_gap=0, crossfade=0):
+    """Assemble les phrases avec silences et fondus, en une seule passe sur un tampon préalloué.
+
+    Durées en trames (sons mono canoniques) :
+    - word_gap : silence entre deux sons d'une même phrase (un son par mot) ;
+    - phrase_gap : silence entre deux phrases ;
+    - crossfade : fondu enchaîné linéaire entre deux sons collés d'une même phrase.
+    Sans silence ni fondu, le résultat est celui de concat_sample_groups().
+    """
+    if min(word_gap, phrase_gap, crossfade) < 0:
+        raise ValueError(f"Durées négatives : word_gap={word_gap}, phrase_gap={phrase_gap}, crossfade={crossfade}")
+    if not (word_gap or phrase_gap or crossfade):
+        return concat_sample_groups(groups)
+
+    # 🔹 Placement de chaque son : (données, début, longueur du fondu d'entrée)
+    placements = []
+    pos = 0
+    for samples in groups:
+        if not samples:
+            continue
+        if placements:
+            pos += phrase_gap
+
+        previous = None
+        for sample in samples:
+            data = sample_array(sample)
+            overlap = 0
+            if previous is not None:
+                if word_gap:
+                    pos += word_gap
+                elif crossfade:
+                    overlap = min(crossfade, len(previous), len(data))
+                    pos -= overlap
+            placements.append((data, pos, overlap))
+            pos += len(data)
+            previous = data
+
+    if not any(overlap for _, _, overlap in placements):
+        # Pas de chevauchement : simple copie, le silence est déjà à zéro
+        out = np.zeros(pos, dtype=SAMPLE_DTYPE)
+        for data, start, _ in placements:
+            out[start:start + len(data)] = data
+        return out
+
+    mix = np.zeros(pos, dtype=np.float32)
+    for k, (data, start, fade_in) in enumerate(placements):
+        # Le fondu de sortie d'un son est le fondu d'entrée du suivant (0 en fin de phrase)
+        fade_out = placements[k + 1][2] if k + 1 < len(placements) else 0
+        segment = data.astype(np.float32)
+        if fade_in:
+            segment[:fade_in] *= _ramp(fade_in)
+        if fade_out:
+            segment[len(segment) - fade_out:] *= 1 - _ramp(fade_out)
+        mix[start:start + len(segment)] += segment
+
+    return np.clip(np.rint(mix), -32768, 32767).astype(SAMPLE_DTYPE)
+
+
+def encode_wav(frames, channels=1, sample_width=2, frame_rate=44100):
+    """Encapsule des trames PCM dans un fichier WAV en mémoire."""
+    output_stream = io.BytesIO()
+    with wave.open(output_stream, "wb") as output_file:
+        output_file.setnchannels(channels)
+        output_file.setsampwidth(sample_width)
+        output_file.setframerate(frame_rate)
+        output_file.writeframes(frames)
+    return output_stream.getvalue()
+
+
+# 📡 Taille inconnue d'un WAV diffusé en continu (convention des flux WAV "infinis")
+WAV_STREAM_SIZE = 0xFFFFFFFF
+
+
+def wav_stream_header(channels=1, sample_width=2, frame_rate=44100):
+    """En-tête WAV de 44 octets pour un flux dont la longueur n'est pas encore connue."""
+    block_align = channels * sample_width
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", WAV_STREAM_SIZE, b"WAVE",
+        b"fmt ", 16, 1, channels, frame_rate, frame_rate * block_align, block_align, sample_width * 8,
+        b"data", WAV_STREAM_SIZE - 36,
+    )
@@ -0,0 +1,89 @@
+"""Benchmark de démarrage : temps d'import de text_to_speech_v2 et première synthèse à froid.
+
+Chaque mesure tourne dans un processus Python neuf :
+    python benchmarks/bench_startup.py [--runs 5] [--pack] [--json resultats.json] [--max-import-ms 300]
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# 📦 Modules qui ne doivent pas être chargés par un simple import (lecture audio, asyncio...)
+LAZY_MODULES = ("simpleaudio", "pydub", "asyncio", "concurrent.futures")
+
+_SNIPPET = """
+import sys, time, json
+t0 = time.perf_counter()
+import text_to_speech_v2
+t1 = time.perf_counter()
+text_to_speech_v2.synthesize("Bonjour à toi ! Comment vas-tu ?", rng=0)
+t2 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "first_synthesis_ms": (t2 - t1) * 1000,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+""" % (LAZY_MODULES,)
+
+
+def run_once(pack_path=None):
+    env = dict(os.environ, PYTHONPATH=ROOT_DIR)
+    env.pop("BD1_SOUND_PACK", None)
+    if pack_path:
+        env["BD1_SOUND_PACK"] = pack_path
+    output = subprocess.run(
+        [sys.executable, "-c", _SNIPPET], cwd=ROOT_DIR, env=env,
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def bench(runs, pack_path=None):
+    results = [run_once(pack_path) for _ in range(runs)]
+    return {
+        "import_ms": statistics.median(r["import_ms"] for r in results),
+        "first_synthesis_ms": statistics.median(r["first_synthesis_ms"] for r in results),
+        "loaded": sorted({m for r in results for m in r["loaded"]}),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--pack", action="store_true", help="Mesurer aussi le chargement depuis un pack")
+    parser.add_argument("--json", help="Fichier où écrire les résultats")
+    parser.add_argument("--max-import-ms", type=float, help="Échoue si l'import dépasse ce temps")
+    args = parser.parse_args()
+
+    report = {"python": sys.version.split()[0], "runs": args.runs, "sounds_dir": bench(args.runs)}
+
+    if args.pack:
+        from sound_bank import build_pack
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            report["sound_pack"] = bench(args.runs, build_pack(os.path.join(tmp_dir, "sounds.pack")))
+
+    for mode in ("sounds_dir", "sound_pack"):
+        if mode in report:
+            r = report[mode]
+            print(f"⏱️ {mode:<10} import {r['import_ms']:7.1f} ms | 1re synthèse {r['first_synthesis_ms']:7.1f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    failed = False
+    loaded = report["sounds_dir"]["loaded"]
+    if loaded:
+        print(f"❌ Modules chargés dès l'import : {', '.join(loaded)}")
+        failed = True
+    if args.max_import_ms is not None and report["sounds_dir"]["import_ms"] > args.max_import_ms:
+        print(f"❌ Import trop lent : {report['sounds_dir']['import_ms']:.1f} ms > {args.max_import_ms} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
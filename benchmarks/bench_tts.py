@@ -0,0 +1,217 @@
+"""Benchmark de synthèse sans carte son : corpus français fixe, graines fixes, résultats JSON.
+
+Chaque implémentation tourne dans son propre processus (pic de mémoire mesuré séparément) :
+    python benchmarks/bench_tts.py [--repeat 20] [--impl v2 v0] [--json resultats.json]
+                                   [--baseline ancien.json --max-regression 0.15]
+
+text_to_speech_v0.py sert de référence historique : il importe simpleaudio dès le chargement,
+mais ne s'en sert que pour la lecture ; sans carte son, un module simpleaudio vide le remplace.
+Il n'est ignoré (avec la raison) que si pydub n'est pas installé.
+"""
+import os
+import io
+import sys
+import json
+import time
+import random
+import argparse
+import importlib.util
+import types
+import contextlib
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# 📝 Corpus fixe : messages courts, moyens et longs
+CORPUS = {
+    "short": [
+        "Bonjour !",
+        "Quel est ton nom ?",
+        "Oui, merci.",
+        "Non, pas encore.",
+        "Attention !",
+        "Je suis prêt.",
+    ],
+    "medium": [
+        "Bonjour à toi ! Comment vas-tu aujourd'hui ?",
+        "Je ne trouve pas le chemin, c'est triste.",
+        "Super, la batterie est chargée et les moteurs répondent.",
+        "Regarde derrière le rocher, il y a quelque chose de brillant !",
+        "Veux-tu que je scanne la pièce avant d'avancer ?",
+    ],
+    "long": [
+        "Bonjour explorateur ! Je m'appelle BD-1 et je viens de terminer l'analyse complète du terrain. "
+        "Les capteurs indiquent une température stable, mais la pression baisse doucement. "
+        "Veux-tu que je prépare un itinéraire plus sûr vers la vallée ?",
+        "Non, je ne pense pas que ce soit une bonne idée. Le pont est fragile et les cordes sont usées. "
+        "Passons plutôt par la grotte, même si elle est sombre. Merci de rester près de moi !",
+        "Super nouvelle : la réparation du bras gauche est terminée. Les articulations répondent "
+        "correctement, la caméra est calibrée et la mémoire a été nettoyée. Prêt pour la prochaine mission ?",
+    ],
+}
+BASE_SEED = 1234
+OPTIONS = {"audio_output": "wav"}
+
+# 🔧 Charges de travail mesurées pour chaque implémentation
+WORKLOADS = ("message", "phrases")
+
+
+def _load(impl):
+    """Importe text_to_speech_<impl> ; les impressions de debug de v0 sont coupées."""
+    if impl == "v0" and importlib.util.find_spec("simpleaudio") is None:
+        # 🔇 Machine sans carte son : v0 importe simpleaudio mais generate_tts_audio() ne joue rien
+        sys.modules["simpleaudio"] = types.ModuleType("simpleaudio")
+    with contextlib.redirect_stdout(io.StringIO()):
+        return __import__(f"text_to_speech_{impl}")
+
+
+def _make_call(module, impl, workload):
+    """Fonction (message, graine) -> octets produits, pour une implémentation et une charge données."""
+    if impl == "v0":
+        # v0 ne prend pas de rng : on fixe la graine du module random global
+        def generate(message, seed):
+            random.seed(seed)
+            return module.generate_tts_audio(message, OPTIONS)[1]
+    else:
+        def generate(message, seed):
+            return module.generate_tts_audio(message, OPTIONS, rng=seed)[1]
+
+    if workload == "message":
+        return lambda message, seed: len(generate(message, seed))
+
+    # 🔹 Pipeline par phrase, comme tts_bd1() (sans la lecture)
+    def phrases(message, seed):
+        return sum(
+            len(generate(phrase, seed + k))
+            for k, (phrase, emotion) in enumerate(module.process_message_by_phrases(message))
+        )
+    return phrases
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux : kilo-octets, macOS : octets
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_impl(impl, repeat):
+    """Mesure une implémentation dans le processus courant. Renvoie le dictionnaire de résultats."""
+    try:
+        module = _load(impl)
+    except ImportError as e:
+        return {"skipped": f"import impossible : {e}"}
+
+    results = {}
+    for workload in WORKLOADS:
+        call = _make_call(module, impl, workload)
+        results[workload] = {}
+        for size, messages in CORPUS.items():
+            with contextlib.redirect_stdout(io.StringIO()):
+                # Premier passage non mesuré : banque de sons et caches chauds
+                for k, message in enumerate(messages):
+                    call(message, BASE_SEED + k)
+
+                latencies = []
+                output_bytes = 0
+                for _ in range(repeat):
+                    for k, message in enumerate(messages):
+                        start = time.perf_counter()
+                        output_bytes += call(message, BASE_SEED + k)
+                        latencies.append(time.perf_counter() - start)
+
+            total = sum(latencies)
+            results[workload][size] = {
+                "utterances": len(latencies),
+                "utterances_per_s": len(latencies) / total,
+                "p50_ms": _percentile(latencies, 0.50) * 1000,
+                "p95_ms": _percentile(latencies, 0.95) * 1000,
+                "output_bytes_per_s": output_bytes / total,
+            }
+
+    return {"peak_rss_mb": _peak_rss_mb(), "workloads": results}
+
+
+def run_isolated(impl, repeat):
+    """Lance run_impl() dans un processus Python neuf et renvoie son résultat."""
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", impl, "--repeat", str(repeat)],
+        cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def compare(report, baseline, max_regression):
+    """Liste des régressions de plus de `max_regression` (fraction) par rapport à un ancien rapport."""
+    failures = []
+    for impl, result in report["implementations"].items():
+        old = baseline.get("implementations", {}).get(impl, {})
+        for workload, sizes in result.get("workloads", {}).items():
+            for size, values in sizes.items():
+                previous = old.get("workloads", {}).get(workload, {}).get(size)
+                if not previous:
+                    continue
+                name = f"{impl}/{workload}/{size}"
+                if values["p50_ms"] > previous["p50_ms"] * (1 + max_regression):
+                    failures.append(f"{name} p50 {previous['p50_ms']:.2f} → {values['p50_ms']:.2f} ms")
+                if values["utterances_per_s"] < previous["utterances_per_s"] / (1 + max_regression):
+                    failures.append(
+                        f"{name} débit {previous['utterances_per_s']:.1f} → {values['utterances_per_s']:.1f} énoncés/s"
+                    )
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Passages mesurés sur le corpus")
+    parser.add_argument("--impl", nargs="+", default=["v2", "v0"], help="Implémentations à mesurer")
+    parser.add_argument("--json", help="Fichier où écrire les résultats")
+    parser.add_argument("--baseline", help="Ancien fichier JSON à comparer")
+    parser.add_argument("--max-regression", type=float, default=0.15, help="Dégradation tolérée (0.15 = 15 %%)")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_impl(args.worker, args.repeat)))
+        sys.exit(0)
+
+    report = {
+        "python": sys.version.split()[0],
+        "repeat": args.repeat,
+        "base_seed": BASE_SEED,
+        "implementations": {impl: run_isolated(impl, args.repeat) for impl in args.impl},
+    }
+
+    for impl, result in report["implementations"].items():
+        if "skipped" in result:
+            print(f"⏭️ {impl} ignoré ({result['skipped']})")
+            continue
+        rss = result["peak_rss_mb"]
+        print(f"📊 {impl} (pic mémoire {rss:.1f} Mo)" if rss is not None else f"📊 {impl}")
+        for workload, sizes in result["workloads"].items():
+            for size, r in sizes.items():
+                print(
+                    f"  {workload:<8} {size:<7} {r['utterances_per_s']:8.1f} énoncés/s | "
+                    f"p50 {r['p50_ms']:7.2f} ms | p95 {r['p95_ms']:7.2f} ms | "
+                    f"{r['output_bytes_per_s'] / 1e6:7.2f} Mo/s"
+                )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            failures = compare(report, json.load(f), args.max_regression)
+        for failure in failures:
+            print(f"❌ Régression : {failure}")
+        sys.exit(1 if failures else 0)
@@ -0,0 +1,131 @@
+import os
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+# 📂 Lexique par défaut, à côté du code
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_LEXICON_PATH = os.path.join(BASE_DIR, "emotion_lexicon.txt")
+
+_WORD_RE = re.compile(r"[^\W\d_]+")
+
+
+def _strip_accents(text):
+    return "".join(c for c in unicodedata.normalize("NFD", text) if unicodedata.category(c) != "Mn")
+
+
+def tokenize(text):
+    """Mots d'un texte : minuscules, sans accents, séparés sur tout ce qui n'est pas une lettre."""
+    return _WORD_RE.findall(_strip_accents(text.lower()))
+
+
+class EmotionLexicon:
+    """Index des mots (ou expressions) indicateurs d'émotion, avec un poids chacun.
+
+    L'index associe le premier mot de chaque entrée à ses entrées possibles : une phrase
+    est notée en un seul passage sur ses mots, quelle que soit la taille du lexique.
+    """
+
+    def __init__(self, entries=()):
+        self._index = defaultdict(list)  # premier mot -> [(mots, émotion, poids)], plus longues d'abord
+        self._priority = {}  # émotion -> rang de première apparition (priorité entre émotions)
+        for cue, emotion, weight in entries:
+            self.add(cue, emotion, weight)
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_LEXICON_PATH, emotions=None):
+        """Charge un lexique texte : `mot ou expression<TAB>émotion[<TAB>poids]`, # pour les commentaires.
+
+        Si `emotions` est donné, une émotion inconnue lève ValueError.
+        """
+        lexicon = cls()
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                fields = [field.strip() for field in line.split("\t")]
+                if len(fields) not in (2, 3):
+                    raise ValueError(f"{path}:{line_number} : attendu 'mot<TAB>émotion[<TAB>poids]'")
+                cue, emotion = fields[:2]
+                if emotions is not None and emotion not in emotions:
+                    raise ValueError(f"{path}:{line_number} : émotion inconnue {emotion!r}")
+                try:
+                    weight = float(fields[2]) if len(fields) == 3 else 1.0
+                except ValueError:
+                    raise ValueError(f"{path}:{line_number} : poids invalide {fields[2]!r}") from None
+                lexicon.add(cue, emotion, weight)
+        return lexicon
+
+    def add(self, cue, emotion, weight=1.0):
+        """Ajoute un mot ou une expression (plusieurs mots) au lexique."""
+        words = tuple(tokenize(cue))
+        if not words:
+            raise ValueError(f"Entrée de lexique vide : {cue!r}")
+        self._priority.setdefault(emotion, len(self._priority))
+        candidates = self._index[words[0]]
+        candidates.append((words, emotion, weight))
+        candidates.sort(key=lambda entry: -len(entry[0]))
+
+    def __len__(self):
+        return sum(len(candidates) for candidates in self._index.values())
+
+    def scores(self, text):
+        """Score de chaque émotion trouvée dans le texte ({} si aucun mot du lexique).
+
+        À chaque position, seule l'entrée la plus longue qui correspond compte, et les mots
+        qu'elle couvre sont sautés : avec « pas » et « pas mal », « pas mal » ne compte qu'une fois.
+        """
+        words = tokenize(text)
+        index = self._index
+        scores = {}
+        i = 0
+        while i < len(words):
+            step = 1
+            for cue, emotion, weight in index.get(words[i], ()):
+                if len(cue) == 1 or tuple(words[i:i + len(cue)]) == cue:
+                    scores[emotion] = scores.get(emotion, 0.0) + weight
+                    step = len(cue)
+                    break
+            i += step
+        return scores
+
+    def best(self, text):
+        """Première émotion du lexique (ordre du fichier) ayant un score positif, ou None.
+
+        L'ordre du fichier fixe la priorité entre émotions ; les poids ne s'additionnent
+        qu'au sein d'une même émotion (un poids négatif peut annuler un autre mot).
+        """
+        scores = self.scores(text)
+        best = None
+        for emotion, score in scores.items():
+            if score <= 0:
+                continue
+            if best is None or self._priority[emotion] < self._priority[best]:
+                best = emotion
+        return best
+
+
+# 🔁 Lexique partagé (chargé une seule fois, à la demande)
+_emotion_lexicon = None
+_emotion_lexicon_lock = threading.Lock()
+
+
+def get_emotion_lexicon():
+    """Renvoie le lexique partagé, chargé au premier appel depuis emotion_lexicon.txt."""
+    global _emotion_lexicon
+    if _emotion_lexicon is None:
+        with _emotion_lexicon_lock:
+            if _emotion_lexicon is None:
+                _emotion_lexicon = EmotionLexicon.from_file()
+    return _emotion_lexicon
+
+
+def set_emotion_lexicon(lexicon):
+    """Remplace le lexique partagé (EmotionLexicon, ou chemin d'un fichier de lexique)."""
+    global _emotion_lexicon
+    if isinstance(lexicon, str):
+        lexicon = EmotionLexicon.from_file(lexicon)
+    with _emotion_lexicon_lock:
+        _emotion_lexicon = lexicon
@@ -0,0 +1,109 @@
+import time
+import threading
+from collections import defaultdict, deque
+
+# ⏱️ Étapes mesurées du pipeline (dans l'ordre d'exécution)
+STAGES = (
+    "phrases",      # process_message_by_phrases
+    "decompose",    # decompose_message
+    "chunking",     # get_sound_chunked (choix des sons dans la banque)
+    "sample_load",  # lecture / décodage du PCM des sons choisis
+    "concat",       # assemblage (silences et fondus compris)
+    "encode",       # encapsulation WAV
+    "playback",     # lecture sur la carte son, jusqu'à la fin du son
+)
+
+
+class PipelineMetrics:
+    """Temps par étape et compteurs du pipeline : rapport par appel + totaux cumulés, sûr entre threads.
+
+    Un rapport est ouvert par l'appel de plus haut niveau (tts_bd1, synthesize...) de chaque
+    thread ; les appels imbriqués et les étapes s'y ajoutent. Les `keep_reports` derniers
+    rapports sont gardés dans `reports`.
+    """
+
+    def __init__(self, keep_reports=100):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reports = deque(maxlen=keep_reports)
+        self.reset()
+
+    def reset(self):
+        """Remet les totaux à zéro et oublie les rapports passés."""
+        with self._lock:
+            self.calls = 0
+            self.stage_time = defaultdict(float)
+            self.stage_calls = defaultdict(int)
+            self.counters = defaultdict(int)
+            self.reports.clear()
+
+    def begin(self, entry, message):
+        """Ouvre le rapport d'un appel. Renvoie None si un rapport est déjà ouvert dans ce thread."""
+        if getattr(self._local, "report", None) is not None:
+            return None
+        report = {"entry": entry, "chars": len(message), "total": 0.0, "stages": {}, "counters": {}}
+        self._local.report = report
+        return report, time.perf_counter()
+
+    def end(self, token):
+        """Ferme le rapport ouvert par begin() et l'ajoute aux rapports récents."""
+        if token is None:
+            return None
+        report, start = token
+        report["total"] = time.perf_counter() - start
+        self._local.report = None
+        with self._lock:
+            self.calls += 1
+            self.reports.append(report)
+        return report
+
+    def add_time(self, stage, seconds):
+        with self._lock:
+            self.stage_time[stage] += seconds
+            self.stage_calls[stage] += 1
+        report = getattr(self._local, "report", None)
+        if report is not None:
+            report["stages"][stage] = report["stages"].get(stage, 0.0) + seconds
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+        report = getattr(self._local, "report", None)
+        if report is not None:
+            report["counters"][name] = report["counters"].get(name, 0) + n
+
+    @property
+    def last_report(self):
+        """Dernier rapport terminé (tous threads confondus), ou None."""
+        with self._lock:
+            return self.reports[-1] if self.reports else None
+
+    def summary(self):
+        """Totaux cumulés : {"calls", "stages": {étape: {total, calls, mean}}, "counters"}."""
+        with self._lock:
+            stages = {
+                stage: {
+                    "total": self.stage_time[stage],
+                    "calls": self.stage_calls[stage],
+                    "mean": self.stage_time[stage] / self.stage_calls[stage],
+                }
+                for stage in sorted(self.stage_time, key=_stage_order)
+            }
+            return {"calls": self.calls, "stages": stages, "counters": dict(self.counters)}
+
+    def format_summary(self):
+        """Résumé lisible des totaux, une ligne par étape (remplace les anciens print de debug)."""
+        summary = self.summary()
+        lines = [f"⏱️ {summary['calls']} appel(s)"]
+        for stage, values in summary["stages"].items():
+            lines.append(
+                f"  {stage:<14} {values['total'] * 1000:9.2f} ms  "
+                f"({values['calls']} fois, {values['mean'] * 1000:.3f} ms en moyenne)"
+            )
+        for name, value in sorted(summary["counters"].items()):
+            lines.append(f"  {name:<14} {value}")
+        return "\n".join(lines)
+
+
+def _stage_order(stage):
+    return STAGES.index(stage) if stage in STAGES else len(STAGES)
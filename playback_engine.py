@@ -0,0 +1,290 @@
+import os
+import time
+import wave
+import queue
+import threading
+
+# ⏱️ Taille des blocs envoyés à la sortie : c'est aussi le délai max d'une interruption
+BLOCK_MS = 20
+POLL_INTERVAL = 0.005
+
+
+class NullSink:
+    """Sortie muette pour les tests : compte les trames reçues, sans carte son.
+
+    Avec realtime=True, chaque bloc « dure » le temps qu'il durerait sur une vraie carte son.
+    """
+
+    block_ms = BLOCK_MS
+
+    def __init__(self, realtime=False):
+        self.realtime = realtime
+        self.frames_written = 0
+        self._bytes_per_second = 0
+        self._frame_size = 1
+        self._interrupted = threading.Event()
+
+    def open(self, channels, sample_width, frame_rate):
+        self._frame_size = channels * sample_width
+        self._bytes_per_second = self._frame_size * frame_rate
+
+    def write(self, data):
+        self.frames_written += len(data) // self._frame_size
+        if self.realtime:
+            self._interrupted.wait(len(data) / self._bytes_per_second)
+
+    def interrupt(self):
+        self._interrupted.set()
+
+    def discard(self):
+        self._interrupted.clear()
+
+    def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class WaveFileSink:
+    """Sortie vers un fichier .wav : enregistre exactement ce qui aurait été joué (coupures comprises)."""
+
+    block_ms = BLOCK_MS
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def open(self, channels, sample_width, frame_rate):
+        self._file = wave.open(self.path, "wb")
+        self._file.setnchannels(channels)
+        self._file.setsampwidth(sample_width)
+        self._file.setframerate(frame_rate)
+
+    def write(self, data):
+        self._file.writeframes(data)
+
+    def interrupt(self):
+        pass
+
+    def discard(self):
+        pass
+
+    def drain(self):
+        pass
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class PygameSink:
+    """Carte son via pygame.mixer : un seul canal ouvert pour toute la durée du moteur.
+
+    Chaque bloc est mis dans la file du canal (Channel.queue) pendant que le précédent est
+    joué : les sons s'enchaînent sans trou et sans réouvrir le périphérique.
+    """
+
+    block_ms = 100  # Assez long pour que le bloc suivant soit toujours prêt à temps
+
+    def __init__(self, buffer=512):
+        self.buffer = buffer
+        self._mixer = None
+        self._channel = None
+        self._interrupted = threading.Event()
+
+    def open(self, channels, sample_width, frame_rate):
+        os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+        import pygame.mixer
+
+        wanted = (frame_rate, -8 * sample_width, channels)
+        if pygame.mixer.get_init() is None:
+            pygame.mixer.init(frequency=frame_rate, size=-8 * sample_width, channels=channels, buffer=self.buffer)
+        if pygame.mixer.get_init() != wanted:
+            raise RuntimeError(f"pygame.mixer déjà ouvert en {pygame.mixer.get_init()}, attendu {wanted}")
+        self._mixer = pygame.mixer
+        self._channel = pygame.mixer.Channel(0)
+
+    def write(self, data):
+        sound = self._mixer.Sound(buffer=bytes(data))
+        # Une seule place d'attente par canal : on attend qu'elle se libère
+        while self._channel.get_queue() is not None:
+            if self._interrupted.is_set():
+                return
+            time.sleep(POLL_INTERVAL)
+        self._channel.queue(sound)  # Joue tout de suite si le canal est libre
+
+    def interrupt(self):
+        self._interrupted.set()
+        self._channel.stop()
+
+    def discard(self):
+        self._channel.stop()
+        self._interrupted.clear()
+
+    def drain(self):
+        while self._channel.get_busy() and not self._interrupted.is_set():
+            time.sleep(POLL_INTERVAL)
+
+    def close(self):
+        if self._channel is not None:
+            self._channel.stop()
+
+
+class Utterance:
+    """Son confié au moteur : attendre sa fin (wait) ou l'interrompre (cancel)."""
+
+    def __init__(self, engine, chunks, generation=0):
+        self._engine = engine
+        self._chunks = chunks
+        self._generation = generation  # Valeur de PlaybackEngine._generation à l'ajout dans la file
+        self._done = threading.Event()
+        self.cancelled = False
+        self.frames_played = 0
+        self.error = None  # Exception levée par la source (ex. : générateur de synthèse)
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Attend la fin de la lecture (ou de l'annulation). Renvoie False si `timeout` expire."""
+        return self._done.wait(timeout)
+
+    def cancel(self):
+        """Annule ce son : retiré de la file, ou coupé en cours de lecture (au bloc près)."""
+        self._engine._cancel(self)
+
+
+class PlaybackEngine:
+    """Moteur de lecture persistant : une sortie ouverte une fois, une file de sons joués bout à bout.
+
+    Les sons sont des octets PCM ou un itérable de blocs PCM (ex. : synthesize_stream()),
+    consommé au fil de la lecture. Un thread unique écrit les sons dans la sortie (`sink`),
+    bloc par bloc : l'annulation prend effet au bloc suivant.
+    """
+
+    def __init__(self, sink=None, channels=1, sample_width=2, frame_rate=44100):
+        self.sink = sink if sink is not None else PygameSink()
+        self.sink.open(channels, sample_width, frame_rate)
+        self._frame_size = channels * sample_width
+        self._block_size = self._frame_size * max(1, frame_rate * self.sink.block_ms // 1000)
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._current = None
+        self._generation = 0  # Incrémenté par clear() : les sons plus anciens ne démarrent plus
+        self._thread = threading.Thread(target=self._run, name="bd1-playback", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def play(self, audio):
+        """Ajoute un son en fin de file et rend la main tout de suite. Renvoie son Utterance."""
+        if isinstance(audio, (bytes, bytearray, memoryview)):
+            audio = (audio,)
+        with self._lock:
+            utterance = Utterance(self, audio, self._generation)
+            self._queue.put(utterance)
+        return utterance
+
+    def barge_in(self, audio):
+        """Coupe le son en cours, vide la file et joue `audio` immédiatement."""
+        self.clear()
+        return self.play(audio)
+
+    def cancel_current(self):
+        """Coupe le son en cours de lecture (la file continue)."""
+        with self._lock:
+            current = self._current
+        if current is not None:
+            current.cancel()
+
+    def clear(self):
+        """Annule tous les sons en attente et celui en cours."""
+        with self._lock:
+            # Couvre aussi un son déjà sorti de la file mais pas encore démarré par le thread de lecture
+            self._generation += 1
+        while True:
+            try:
+                utterance = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if utterance is not None:
+                utterance.cancelled = True
+                utterance._done.set()
+        self.cancel_current()
+
+    @property
+    def busy(self):
+        """Vrai si un son est en cours ou en attente."""
+        return self._current is not None or not self._queue.empty()
+
+    def close(self):
+        """Arrête le moteur (sons en attente annulés) et ferme la sortie."""
+        self.clear()
+        self._queue.put(None)
+        self._thread.join()
+        self.sink.close()
+
+    def _cancel(self, utterance):
+        with self._lock:
+            utterance.cancelled = True
+            if self._current is utterance:
+                # Débloque l'écriture en cours ; le reste du son sera jeté par le thread de lecture
+                self.sink.interrupt()
+            else:
+                # Encore en file : il sera sauté, inutile de faire attendre wait()
+                utterance._done.set()
+
+    def _run(self):
+        while True:
+            utterance = self._queue.get()
+            if utterance is None:
+                return
+
+            with self._lock:
+                if utterance._generation != self._generation:
+                    utterance.cancelled = True  # clear() est passé entre get() et ici
+                if not utterance.cancelled:
+                    self._current = utterance
+            if utterance.cancelled:
+                utterance._done.set()
+                continue
+
+            try:
+                self._play(utterance)
+            except Exception as e:
+                utterance.error = e
+            finally:
+                with self._lock:
+                    self._current = None
+                if utterance.cancelled:
+                    self.sink.discard()
+                elif self._queue.empty():
+                    # Rien derrière : attendre que la carte son ait fini avant de signaler la fin
+                    self.sink.drain()
+                utterance._done.set()
+
+    def _play(self, utterance):
+        block_size = self._block_size
+        chunks = iter(utterance._chunks)
+        try:
+            for chunk in chunks:
+                view = memoryview(chunk)
+                for start in range(0, len(view), block_size):
+                    if utterance.cancelled:
+                        return
+                    block = view[start:start + block_size]
+                    self.sink.write(block)
+                    utterance.frames_played += len(block) // self._frame_size
+        finally:
+            # Générateur de synthèse abandonné en cours de route : on le ferme proprement
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
@@ -0,0 +1,75 @@
+import os
+import hashlib
+from sound_bank import ByteBudgetCache
+
+# 🔖 À incrémenter quand le rendu change (invalide le cache disque)
+RENDER_VERSION = 2
+
+
+def is_cacheable_seed(rng):
+    """Seule une graine fixe (int/str/bytes) donne un rendu déterministe, donc cachable."""
+    return isinstance(rng, (int, str, bytes)) and not isinstance(rng, bool)
+
+
+class RenderCache(ByteBudgetCache):
+    """Cache des rendus complets : (phrase, émotion, graine, empreinte de la banque, ...) → octets encodés.
+
+    LRU borné en mémoire, avec persistance optionnelle dans `cache_dir` : une entrée
+    absente de la mémoire est relue depuis le disque avant d'être recalculée.
+    Les fichiers sont en .bin : selon la clé, ils contiennent du WAV, du WAV G.711 ou du FLAC.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, cache_dir=None):
+        super().__init__(max_bytes)
+        self.cache_dir = cache_dir
+        self.disk_hits = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, key):
+        """Renvoie le rendu mis en cache pour `key`, ou None."""
+        value = self.lookup(key)
+        if value is None and self.cache_dir:
+            value = self._read_disk(key)
+            if value is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                self.store(key, value)
+        return value
+
+    def put(self, key, value):
+        self.store(key, value)
+        if self.cache_dir:
+            self._write_disk(key, value)
+
+    def _disk_path(self, key):
+        digest = hashlib.sha1(repr((RENDER_VERSION,) + key).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest + ".bin")
+
+    def _read_disk(self, key):
+        try:
+            with open(self._disk_path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, key, value):
+        import tempfile
+
+        # Écriture atomique : fichier temporaire puis renommage
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(value)
+            os.replace(tmp_path, self._disk_path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def stats(self):
+        """Compteurs du cache ; `disk_hits` compte les absences en mémoire servies par le disque."""
+        stats = super().stats()
+        with self._lock:
+            stats["disk_hits"] = self.disk_hits
+        return stats
@@ -0,0 +1,659 @@
+import os
+import re
+import json
+import mmap
+import struct
+import hashlib
+import wave
+import random
+import threading
+from collections import Counter, OrderedDict, namedtuple
+from audio_render import (
+    CANONICAL_CHANNELS, CANONICAL_SAMPLE_WIDTH, CANONICAL_FRAME_RATE, to_canonical, peak_dbfs, sample_array,
+    resample, pitch_shift,
+)
+
+# 📂 Définition des dossiers
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SOUNDS_DIR = os.path.join(BASE_DIR, "sounds")
+
+# 📌 Dossiers de compositions : "{n}_caracteres"
+_COMPOSITION_DIR_RE = re.compile(r"^(\d+)_caracteres$")
+
+# 📦 Fichier pack : MAGIC, taille de l'en-tête JSON (uint32), en-tête, puis PCM int16 contigu
+PACK_MAGIC = b"BD1PACK\x00"
+PACK_VERSION = 1
+DEFAULT_PACK_PATH = os.path.join(BASE_DIR, "sounds.pack")
+_PACK_ALIGN = 16
+
+# 🎚️ Format d'origine d'un son (mêmes noms de champs que wave.getparams())
+SampleFormat = namedtuple("SampleFormat", "nchannels sampwidth framerate nframes")
+
+# 🎭 Variantes d'émotion dérivées des sons neutres (pack uniquement) : émotion → (demi-tons, étirement de la durée)
+EMOTION_VARIANTS = {
+    "question": (3, 1.0),
+    "surprise": (5, 0.85),
+    "positif": (2, 0.92),
+    "negatif": (-2, 1.1),
+    "triste": (-4, 1.25),
+}
+DERIVED_SEPARATOR = "~"  # "BS7.wav" → "BS7~triste.wav"
+# Une recherche ayant au moins ce nombre d'enregistrements n'est pas complétée par des variantes dérivées
+EMOTION_VARIANTS_MIN_RECORDED = 1
+
+# 🧠 Noms des familles BSP dans les dossiers de compositions ("Beep Piano" → "BP")
+GROUP_NAMES = {"B": "Beep", "S": "Sifflement", "P": "Piano"}
+
+
+def resolve_rng(rng=None):
+    """Normalise le paramètre `rng` des fonctions de synthèse.
+
+    None → générateur global du module `random` ; entier (ou str/bytes) → random.Random(graine) ;
+    instance de random.Random → utilisée telle quelle.
+    """
+    if rng is None or rng is random:
+        return random
+    if isinstance(rng, random.Random):
+        return rng
+    return random.Random(rng)
+
+
+def _list_wavs(folder):
+    """Liste les .wav d'un dossier dans l'ordre de os.listdir (ordre utilisé par random.choice)."""
+    return tuple(f for f in os.listdir(folder) if f.endswith(".wav"))
+
+
+def _subdirs(folder):
+    if not os.path.isdir(folder):
+        return []
+    return [d for d in os.listdir(folder) if os.path.isdir(os.path.join(folder, d))]
+
+
+def _fingerprint(folders):
+    """Empreinte du contenu indexé (noms dans l'ordre de tirage, tailles, dates) pour invalider les caches."""
+    digest = hashlib.sha1()
+    for key in sorted(folders, key=repr):
+        folder, names = folders[key]
+        digest.update(repr(key).encode("utf-8"))
+        for name in names:
+            stat = os.stat(os.path.join(folder, name))
+            digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _build_trie(folders):
+    """Trie des préfixes BSP ayant au moins un son (toutes émotions confondues).
+
+    Chaque nœud est un dict lettre → nœud ; la clé None d'un nœud terminal
+    contient (longueur, motif, préfixe), prêt à être passé à choose().
+    """
+    names_to_group = {name: group for group, name in GROUP_NAMES.items()}
+    trie = {}
+    for (chunk_len, pattern, emotion), (_, names) in folders.items():
+        if pattern is None or chunk_len < 2:
+            continue
+        groups = [names_to_group.get(name) for name in pattern.split(" ")]
+        if len(groups) != chunk_len or None in groups:
+            continue
+        prefix = "".join(groups)
+        if not any(name.lower().startswith(prefix.lower()) for name in names):
+            continue
+        node = trie
+        for group in groups:
+            node = node.setdefault(group, {})
+        node[None] = (chunk_len, pattern, prefix)
+    return trie
+
+
+class SoundBank:
+    """Index en mémoire de la banque de sons, construit une seule fois.
+
+    Les variantes sont indexées par (longueur du chunk, motif BSP, émotion, préfixe) :
+    - compositions/{n}_caracteres/{motif}/{émotion}/ → (n, "Beep Piano", "neutre", "BP")
+    - emotions/{émotion}/                            → (1, None, "triste", "s")
+    - consonnes/                                      → (1, None, None, "s")
+
+    Les recherches ne touchent plus le disque ; appeler `reload()` si la banque change.
+    """
+
+    def __init__(self, sounds_dir=SOUNDS_DIR, pack_path=None):
+        self.sounds_dir = sounds_dir
+        self.pack_path = pack_path
+        self._state = None
+        self.reload()
+
+    @classmethod
+    def from_pack(cls, pack_path=DEFAULT_PACK_PATH, sounds_dir=SOUNDS_DIR):
+        """Ouvre une banque précompilée par build_pack() : un seul fichier, projeté en mémoire (mmap)."""
+        return cls(sounds_dir, pack_path)
+
+    def reload(self):
+        """Recharge la banque (dossier `sounds/` ou pack) et remplace l'index d'un bloc."""
+        if self.pack_path:
+            folders, formats, samples, fingerprint = _read_pack(self.pack_path, self.sounds_dir)
+        else:
+            folders, formats, samples, fingerprint = self._scan()
+
+        by_path = {os.path.normpath(folder): key for key, (folder, _) in folders.items()}
+        self.fingerprint = fingerprint
+        self.formats = formats
+        self._samples = samples
+        # (dossiers, chemin → clé, mémo des variantes par préfixe, trie des compositions, mémo des mots)
+        self._state = (folders, by_path, {}, _build_trie(folders), {})
+
+    def _scan(self):
+        """Parcourt `sounds/` : index des dossiers, format de chaque son, sons convertis."""
+        folders = {}
+
+        compositions_dir = os.path.join(self.sounds_dir, "compositions")
+        for size_dir in _subdirs(compositions_dir):
+            match = _COMPOSITION_DIR_RE.match(size_dir)
+            if not match:
+                continue
+            chunk_len = int(match.group(1))
+            size_path = os.path.join(compositions_dir, size_dir)
+            for pattern in _subdirs(size_path):
+                pattern_path = os.path.join(size_path, pattern)
+                for emotion in _subdirs(pattern_path):
+                    folder = os.path.join(pattern_path, emotion)
+                    folders[(chunk_len, pattern, emotion)] = (folder, _list_wavs(folder))
+
+        emotions_dir = os.path.join(self.sounds_dir, "emotions")
+        for emotion in _subdirs(emotions_dir):
+            folder = os.path.join(emotions_dir, emotion)
+            folders[(1, None, emotion)] = (folder, _list_wavs(folder))
+
+        consonnes_dir = os.path.join(self.sounds_dir, "consonnes")
+        if os.path.isdir(consonnes_dir):
+            folders[(1, None, None)] = (consonnes_dir, _list_wavs(consonnes_dir))
+
+        # 🔎 Vérification du format de chaque son ; les non conformes sont convertis une fois pour toutes
+        formats = {}
+        converted = {}
+        for folder, names in folders.values():
+            for name in names:
+                path = os.path.join(folder, name)
+                with wave.open(path, "rb") as wav_file:
+                    params = wav_file.getparams()
+                formats[path] = SampleFormat(params.nchannels, params.sampwidth, params.framerate, params.nframes)
+                if not is_canonical(params):
+                    converted[path] = load_sample(path)
+
+        return folders, formats, converted, _fingerprint(folders)
+
+    def sample(self, path):
+        """PCM d'un son déjà en mémoire dans la banque (son converti, ou vue sur le pack), sinon None."""
+        return self._samples.get(path)
+
+    def __len__(self):
+        folders = self._state[0]
+        return sum(len(names) for _, names in folders.values())
+
+    def __contains__(self, path):
+        """Vrai si `path` est un son indexé par la banque (y compris un son qui n'existe que dans le pack)."""
+        folders, by_path = self._state[:2]
+        folder, name = os.path.split(path)
+        key = by_path.get(os.path.normpath(folder))
+        return key is not None and name in folders[key][1]
+
+    def sample_paths(self):
+        """Itère sur les chemins de tous les sons indexés."""
+        folders = self._state[0]
+        for folder, names in folders.values():
+            for name in names:
+                yield os.path.join(folder, name)
+
+    def variants(self, chunk_len, pattern, emotion, prefix):
+        """Renvoie (dossier, noms de fichiers) des variantes d'une clé ; (None, ()) si absente."""
+        folders, _, memo = self._state[:3]
+        key = (chunk_len, pattern, emotion, prefix.lower())
+        found = memo.get(key)
+        if found is None:
+            entry = folders.get(key[:3])
+            if entry is None:
+                found = (None, ())
+            else:
+                folder, names = entry
+                found = (folder, tuple(f for f in names if f.lower().startswith(key[3])))
+            memo[key] = found
+        return found
+
+    def word_memo(self):
+        """Mémo des sons possibles par mot (tenu par text_to_speech_v2), remis à zéro par reload()."""
+        return self._state[4]
+
+    def folder_variants(self, folder, prefix):
+        """Variantes d'un dossier donné par son chemin (compatibilité avec get_random_variant)."""
+        by_path = self._state[1]
+        key = by_path.get(os.path.normpath(folder))
+        if key is not None:
+            return self.variants(*key, prefix)[1]
+        # 🔸 Dossier hors banque : lecture directe du disque
+        if not os.path.exists(folder):
+            return ()
+        return tuple(f for f in _list_wavs(folder) if f.lower().startswith(prefix.lower()))
+
+    def validate(self):
+        """Rapport complet de la banque : format, durée et niveau crête de chaque son.
+
+        Chaque entrée indique les problèmes détectés (`issues`) ; les sons hors format
+        canonique sont déjà convertis par reload(), mais doivent être corrigés à la source.
+        """
+        report = []
+        for path, params in self.formats.items():
+            sample = self.sample(path)
+            if sample is None:  # Pas de `or` : un Sample vide est faux (__len__ nul)
+                sample = load_sample(path)
+            peak = peak_dbfs(sample_array(sample))
+            issues = []
+            if params.nchannels != CANONICAL_CHANNELS:
+                issues.append(f"{params.nchannels} canaux")
+            if params.sampwidth != CANONICAL_SAMPLE_WIDTH:
+                issues.append(f"{params.sampwidth * 8} bits")
+            if params.framerate != CANONICAL_FRAME_RATE:
+                issues.append(f"{params.framerate} Hz")
+            if not params.nframes:
+                issues.append("vide")
+            elif peak == float("-inf"):
+                issues.append("silencieux")
+            elif peak >= -0.1:
+                issues.append("saturé")
+            report.append({
+                "path": path,
+                "channels": params.nchannels,
+                "sample_width": params.sampwidth,
+                "frame_rate": params.framerate,
+                "duration": params.nframes / params.framerate if params.framerate else 0.0,
+                "peak_dbfs": peak,
+                "issues": issues,
+            })
+        return report
+
+    def composition_chunks(self, groups, start, max_len):
+        """Chunks de compositions disponibles au début de groups[start:start + max_len].
+
+        Un seul parcours du trie : renvoie les (longueur, motif, préfixe) ayant des sons,
+        du plus long au plus court ; les longueurs sans aucun son ne sont jamais proposées.
+        """
+        node = self._state[3]
+        found = []
+        for k in range(start, min(start + max_len, len(groups))):
+            node = node.get(groups[k])
+            if node is None:
+                break
+            chunk = node.get(None)
+            if chunk is not None:
+                found.append(chunk)
+        found.reverse()
+        return found
+
+    def choose(self, chunk_len, pattern, emotion, prefix, used_variants, rng=random):
+        """Tire une variante non encore utilisée et l'ajoute à `used_variants` ; None si aucune."""
+        folder, names = self.variants(chunk_len, pattern, emotion, prefix)
+        candidates = [f for f in names if f not in used_variants]
+
+        if candidates: #Ne pas répéter le meme son 2 fois
+            chosen = rng.choice(candidates)
+            used_variants.add(chosen)
+            return os.path.join(folder, chosen)
+        return None
+
+
+class Sample:
+    """PCM décodé d'un fichier .wav, exposé en lecture seule."""
+
+    __slots__ = ("data", "channels", "sample_width", "frame_rate")
+
+    def __init__(self, data, channels, sample_width, frame_rate):
+        self.data = data  # bytes (immuable)
+        self.channels = channels
+        self.sample_width = sample_width
+        self.frame_rate = frame_rate
+
+    @property
+    def pcm(self):
+        """Vue mémoire en lecture seule sur les trames PCM (sans copie)."""
+        return memoryview(self.data)
+
+    @property
+    def nframes(self):
+        return len(self.data) // (self.channels * self.sample_width)
+
+    def __len__(self):
+        return len(self.data)
+
+
+def is_canonical(params):
+    """Vrai si des paramètres WAV correspondent au format canonique (mono, 16 bits, 44,1 kHz)."""
+    return (
+        params.nchannels == CANONICAL_CHANNELS
+        and params.sampwidth == CANONICAL_SAMPLE_WIDTH
+        and params.framerate == CANONICAL_FRAME_RATE
+    )
+
+
+def load_sample(path):
+    """Décode un .wav en Sample au format canonique (converti si besoin)."""
+    with wave.open(path, "rb") as wav_file:
+        params = wav_file.getparams()
+        data = wav_file.readframes(params.nframes)
+
+    if not is_canonical(params):
+        data = to_canonical(data, params.nchannels, params.sampwidth, params.framerate).tobytes()
+    return Sample(data, CANONICAL_CHANNELS, CANONICAL_SAMPLE_WIDTH, CANONICAL_FRAME_RATE)
+
+
+class ByteBudgetCache:
+    """Cache LRU borné en octets (max_bytes=None : aucune limite), sûr entre threads.
+
+    Les compteurs `hits` / `misses` / `evictions` servent à dimensionner le budget.
+    """
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, key):
+        """Renvoie la valeur associée à `key` (None si absente) en mettant les compteurs à jour."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+            return None
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def store(self, key, value):
+        with self._lock:
+            if key in self._entries:
+                return
+            if self.max_bytes is not None and len(value) > self.max_bytes:
+                return  # 🔸 Plus gros que tout le budget : on ne le garde pas
+            self._entries[key] = value
+            self._bytes += len(value)
+            while self.max_bytes is not None and self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Compteurs du cache (taux de réussite, octets occupés, budget)."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class SampleCache(ByteBudgetCache):
+    """Cache des sons décodés : tout en mémoire (max_bytes=None) ou LRU borné en octets.
+
+    Les sons sont rangés par (empreinte de la banque, chemin) : après un reload() qui voit
+    un fichier modifié, l'empreinte change et le son est relu au lieu d'être resservi.
+    """
+
+    def get(self, path, bank=None):
+        """Renvoie le Sample de `path`, décodé depuis le disque uniquement au premier accès.
+
+        Avec `bank`, un son servi par la banque elle-même (pack, variante dérivée qui n'existe
+        que dans le pack) est renvoyé tel quel, sans passer par le cache ni par le disque.
+        """
+        fingerprint = None
+        if bank is not None:
+            sample = bank.sample(path)
+            if sample is not None:
+                return sample
+            fingerprint = bank.fingerprint
+        key = (fingerprint, path)
+        sample = self.lookup(key)
+        if sample is None:
+            sample = load_sample(path)
+            self.store(key, sample)
+        return sample
+
+    def preload(self, bank):
+        """Décode d'avance les sons de la banque (sans toucher aux compteurs).
+
+        Les sons que la banque sert déjà elle-même (pack projeté en mémoire, sons convertis)
+        sont laissés de côté : ni copie en double, ni relecture de sounds/.
+        """
+        fingerprint = bank.fingerprint
+        for path in bank.sample_paths():
+            if bank.sample(path) is None and (fingerprint, path) not in self:
+                self.store((fingerprint, path), load_sample(path))
+
+
+class ResampledSampleCache(ByteBudgetCache):
+    """Copies des sons à une autre fréquence, calculées une seule fois par (banque, son, fréquence)."""
+
+    def get(self, path, frame_rate, sample_loader=load_sample, fingerprint=None):
+        """Renvoie le Sample de `path` à `frame_rate` Hz, rééchantillonné au premier accès."""
+        key = (fingerprint, path, frame_rate)
+        sample = self.lookup(key)
+        if sample is None:
+            source = sample_loader(path)
+            data = resample(sample_array(source), source.frame_rate, frame_rate).tobytes()
+            sample = Sample(data, CANONICAL_CHANNELS, CANONICAL_SAMPLE_WIDTH, frame_rate)
+            self.store(key, sample)
+        return sample
+
+
+def derive_emotion_variants(bank, variants=EMOTION_VARIANTS, min_recorded=EMOTION_VARIANTS_MIN_RECORDED):
+    """Calcule des variantes d'émotion, à partir des sons neutres, là où la banque manque d'enregistrements.
+
+    Une recherche de son est un dossier compositions/{n}_caracteres/{motif}/{émotion}/, ou une lettre
+    de emotions/{émotion}/. Si elle a moins de `min_recorded` enregistrements (par défaut : aucun),
+    chaque son neutre correspondant (compositions/.../neutre/, ou la lettre dans consonnes/) y est
+    ajouté sous le nom « {nom}~{émotion}.wav », transposé et étiré selon `variants`.
+    Les dossiers déjà enregistrés ne reçoivent aucun son synthétique.
+    Renvoie {(longueur, motif, émotion): (dossier, [(nom, Sample)])}.
+    """
+    folders = bank._state[0]
+    derived = {}
+    for (chunk_len, pattern, emotion), (source_folder, names) in folders.items():
+        if pattern is not None and emotion == "neutre":
+            parent = os.path.dirname(source_folder)  # compositions/{n}_caracteres/{motif}/
+            by_letter = False
+        elif pattern is None and emotion is None:
+            parent = os.path.join(bank.sounds_dir, "emotions")  # consonnes/ → emotions/{émotion}/
+            by_letter = True  # Les sons d'une lettre sont cherchés par la première lettre du nom
+        else:
+            continue
+
+        for target, (semitones, stretch) in variants.items():
+            key = (chunk_len, pattern, target)
+            folder, recorded = folders.get(key, (os.path.join(parent, target), ()))
+            counts = Counter(name[0].lower() if by_letter else None for name in recorded)
+            files = []
+            for name in names:
+                if counts[name[0].lower() if by_letter else None] >= min_recorded:
+                    continue  # 🔸 Assez de vrais enregistrements pour cette recherche
+                path = os.path.join(source_folder, name)
+                source = bank.sample(path)
+                if source is None:
+                    source = load_sample(path)
+                data = pitch_shift(sample_array(source), semitones, stretch, source.frame_rate).tobytes()
+                stem, ext = os.path.splitext(name)
+                files.append((f"{stem}{DERIVED_SEPARATOR}{target}{ext}", Sample(
+                    data, CANONICAL_CHANNELS, CANONICAL_SAMPLE_WIDTH, CANONICAL_FRAME_RATE,
+                )))
+            if files:
+                derived[key] = (folder, files)
+    return derived
+
+
+def build_pack(pack_path=DEFAULT_PACK_PATH, sounds_dir=SOUNDS_DIR, emotion_variants=None,
+               min_recorded=EMOTION_VARIANTS_MIN_RECORDED):
+    """Compile toute la banque dans un seul fichier : en-tête JSON (index) + PCM canonique contigu.
+
+    Avec `emotion_variants` (ex. : EMOTION_VARIANTS), les variantes d'émotion dérivées des sons
+    neutres (voir derive_emotion_variants) sont calculées ici, une fois pour toutes, et rangées
+    dans le pack avec les autres sons.
+    """
+    bank = SoundBank(sounds_dir)
+    folders = bank._state[0]
+    derived = derive_emotion_variants(bank, emotion_variants, min_recorded) if emotion_variants else {}
+    fingerprint = bank.fingerprint
+    if emotion_variants:
+        # Le choix des sons change : les caches indexés par l'empreinte ne doivent pas resservir
+        variants_key = json.dumps([emotion_variants, min_recorded], sort_keys=True)
+        fingerprint = hashlib.sha1(f"{fingerprint}:{variants_key}".encode("utf-8")).hexdigest()
+
+    entries = []
+    chunks = []
+    offset = 0
+    for key in list(folders) + [key for key in derived if key not in folders]:
+        chunk_len, pattern, emotion = key
+        derived_folder, derived_files = derived.get(key, (None, ()))
+        folder, names = folders.get(key, (derived_folder, ()))
+        files = []
+        for name in names:
+            path = os.path.join(folder, name)
+            sample = bank.sample(path)
+            if sample is None:
+                sample = load_sample(path)
+            fmt = bank.formats[path]
+            files.append([name, offset, sample.nframes, fmt.nchannels, fmt.sampwidth, fmt.framerate, fmt.nframes])
+            chunks.append(bytes(sample.data))
+            offset += len(sample.data)
+        # 🎭 Variantes dérivées, après les enregistrements (déjà au format canonique)
+        for name, sample in derived_files:
+            files.append([name, offset, sample.nframes, CANONICAL_CHANNELS, CANONICAL_SAMPLE_WIDTH,
+                          CANONICAL_FRAME_RATE, sample.nframes])
+            chunks.append(sample.data)
+            offset += len(sample.data)
+        rel_folder = os.path.relpath(folder, sounds_dir).replace(os.sep, "/")
+        entries.append([chunk_len, pattern, emotion, rel_folder, files])
+
+    header = json.dumps({
+        "version": PACK_VERSION,
+        "fingerprint": fingerprint,
+        "emotion_variants": emotion_variants or None,
+        "min_recorded": min_recorded if emotion_variants else None,
+        "folders": entries,
+    }).encode("utf-8")
+    prefix_len = len(PACK_MAGIC) + 4 + len(header)
+    padding = b"\x00" * (-prefix_len % _PACK_ALIGN)
+
+    # Écriture atomique : fichier temporaire puis renommage
+    tmp_path = pack_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(PACK_MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        f.write(padding)
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(tmp_path, pack_path)
+    return pack_path
+
+
+def _read_pack(pack_path, sounds_dir):
+    """Projette un pack en mémoire ; les Sample renvoyés sont des vues sans copie sur le mmap."""
+    with open(pack_path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapped)
+    if bytes(view[:len(PACK_MAGIC)]) != PACK_MAGIC:
+        raise ValueError(f"{pack_path} n'est pas un pack de sons BD-1")
+    (header_len,) = struct.unpack_from("<I", view, len(PACK_MAGIC))
+    header_start = len(PACK_MAGIC) + 4
+    header = json.loads(bytes(view[header_start:header_start + header_len]).decode("utf-8"))
+    if header["version"] != PACK_VERSION:
+        raise ValueError(f"Version de pack non gérée : {header['version']}")
+    data_start = header_start + header_len
+    data_start += -data_start % _PACK_ALIGN
+
+    folders = {}
+    formats = {}
+    samples = {}
+    frame_width = CANONICAL_CHANNELS * CANONICAL_SAMPLE_WIDTH
+    for chunk_len, pattern, emotion, rel_folder, files in header["folders"]:
+        folder = os.path.join(sounds_dir, *rel_folder.split("/"))
+        folders[(chunk_len, pattern, emotion)] = (folder, tuple(f[0] for f in files))
+        for name, offset, nframes, channels, sample_width, frame_rate, source_nframes in files:
+            path = os.path.join(folder, name)
+            start = data_start + offset
+            samples[path] = Sample(
+                view[start:start + nframes * frame_width],
+                CANONICAL_CHANNELS, CANONICAL_SAMPLE_WIDTH, CANONICAL_FRAME_RATE,
+            )
+            formats[path] = SampleFormat(channels, sample_width, frame_rate, source_nframes)
+
+    return folders, formats, samples, header["fingerprint"]
+
+
+_sound_bank = None
+_sound_bank_lock = threading.Lock()
+
+
+def get_sound_bank():
+    """Renvoie la banque de sons partagée (construite au premier appel).
+
+    Si la variable d'environnement BD1_SOUND_PACK désigne un pack, il est utilisé
+    à la place du parcours de `sounds/`.
+    """
+    global _sound_bank
+    if _sound_bank is None:
+        with _sound_bank_lock:
+            if _sound_bank is None:
+                pack_path = os.environ.get("BD1_SOUND_PACK")
+                _sound_bank = SoundBank.from_pack(pack_path) if pack_path else SoundBank()
+    return _sound_bank
+
+
+def set_sound_bank(bank):
+    """Remplace la banque partagée (par exemple par SoundBank.from_pack(...))."""
+    global _sound_bank
+    with _sound_bank_lock:
+        _sound_bank = bank
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Vérifie la banque de sons ou la compile en pack.")
+    parser.add_argument("--pack", nargs="?", const=DEFAULT_PACK_PATH, help="Chemin du pack à générer")
+    parser.add_argument("--emotion-variants", action="store_true",
+                        help="Ajoute au pack les variantes d'émotion dérivées des sons neutres")
+    parser.add_argument("--min-recorded", type=int, default=EMOTION_VARIANTS_MIN_RECORDED,
+                        help="Complète les recherches ayant moins d'enregistrements que ce nombre (défaut : 1)")
+    args = parser.parse_args()
+
+    if args.pack:
+        # 📦 Compilation : python sound_bank.py --pack [chemin] [--emotion-variants [--min-recorded N]]
+        build_pack(args.pack, emotion_variants=EMOTION_VARIANTS if args.emotion_variants else None,
+                   min_recorded=args.min_recorded)
+        print(f"📦 Pack écrit : {args.pack} ({os.path.getsize(args.pack) / 1e6:.1f} Mo)")
+    else:
+        # 🔎 Vérification de la banque : python sound_bank.py
+        report = get_sound_bank().validate()
+        total = sum(entry["duration"] for entry in report)
+        print(f"📂 {len(report)} sons, {total:.1f} s au total")
+        for entry in report:
+            if entry["issues"]:
+                print(f"⚠️ {os.path.relpath(entry['path'], SOUNDS_DIR)} : {', '.join(entry['issues'])}"
+                      f" ({entry['duration']:.2f} s, crête {entry['peak_dbfs']:.1f} dBFS)")
+        if not any(entry["issues"] for entry in report):
+            print("✅ Tous les sons sont au format canonique")
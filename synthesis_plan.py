@@ -0,0 +1,102 @@
+import os
+import json
+
+from sound_bank import SOUNDS_DIR
+
+# 🧾 Plan de synthèse : les sons choisis pour un message, sans leur PCM
+PLAN_VERSION = 1
+
+
+class PlanStep:
+    """Un son choisi : chemin, émotion utilisée, longueur du chunk et lettres d'origine.
+
+    Se décompose comme l'ancien 4-uplet : `path, emotion, chunk_len, original = step`.
+    """
+
+    __slots__ = ("path", "emotion", "chunk_len", "original")
+
+    def __init__(self, path, emotion, chunk_len, original):
+        self.path = path
+        self.emotion = emotion
+        self.chunk_len = chunk_len
+        self.original = original
+
+    def __iter__(self):
+        return iter((self.path, self.emotion, self.chunk_len, self.original))
+
+    def __eq__(self, other):
+        if not isinstance(other, PlanStep):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    def __repr__(self):
+        return f"PlanStep({self.path!r}, {self.emotion!r}, {self.chunk_len}, {self.original!r})"
+
+
+class PhrasePlan:
+    """Sons d'une phrase, avec son texte et l'émotion retenue."""
+
+    __slots__ = ("text", "emotion", "steps")
+
+    def __init__(self, text, emotion, steps):
+        self.text = text
+        self.emotion = emotion
+        self.steps = steps
+
+
+class SynthesisPlan:
+    """Plan complet d'un message : rendu plus tard (render_plan) ou ailleurs, après sérialisation.
+
+    Les sons sont enregistrés par chemin relatif au dossier sounds/ : le plan se relit avec toute
+    banque qui contient ces sons (copie du dossier, ou pack compilé depuis lui). Un plan fait avec
+    un pack à variantes d'émotion (--emotion-variants) cite des sons « ~émotion » qui n'existent
+    que dans ce pack : render_plan() refuse alors de le rendre avec une autre banque.
+    """
+
+    __slots__ = ("phrases",)
+
+    def __init__(self, phrases):
+        self.phrases = phrases
+
+    def __len__(self):
+        return sum(len(phrase.steps) for phrase in self.phrases)
+
+    def steps(self):
+        """Tous les sons du plan, dans l'ordre de lecture."""
+        return [step for phrase in self.phrases for step in phrase.steps]
+
+    def to_dict(self, sounds_dir=SOUNDS_DIR):
+        return {
+            "version": PLAN_VERSION,
+            "phrases": [
+                [phrase.text, phrase.emotion, [
+                    [_sample_key(step.path, sounds_dir), step.emotion, step.chunk_len, step.original]
+                    for step in phrase.steps
+                ]]
+                for phrase in self.phrases
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data, sounds_dir=SOUNDS_DIR):
+        if data.get("version") != PLAN_VERSION:
+            raise ValueError(f"Version de plan non gérée : {data.get('version')!r}")
+        return cls([
+            PhrasePlan(text, emotion, [
+                PlanStep(os.path.join(sounds_dir, *key.split("/")), step_emotion, chunk_len, original)
+                for key, step_emotion, chunk_len, original in steps
+            ])
+            for text, emotion, steps in data["phrases"]
+        ])
+
+    def to_json(self, sounds_dir=SOUNDS_DIR):
+        return json.dumps(self.to_dict(sounds_dir), ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, text, sounds_dir=SOUNDS_DIR):
+        return cls.from_dict(json.loads(text), sounds_dir)
+
+
+def _sample_key(path, sounds_dir):
+    """Clé portable d'un son : chemin relatif à sounds/, séparé par des /."""
+    return os.path.relpath(path, sounds_dir).replace(os.sep, "/")
@@ -0,0 +1,102 @@
+import queue
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from sound_bank import get_sound_bank, SampleCache
+from render_cache import RenderCache
+from audio_render import encode_wav
+import text_to_speech_v2 as tts
+
+
+class BD1Synthesizer:
+    """Service de synthèse partageable entre threads (plusieurs robots / clients dans un même processus).
+
+    Chaque instance a sa banque de sons, son générateur aléatoire et ses caches : aucun état
+    global n'est modifié. Chaque requête tire sa propre graine, donc deux requêtes en parallèle
+    ne se partagent jamais un `random.Random`. Le rendu asynchrone passe par un pool de
+    `workers` threads et au plus `max_pending` requêtes en attente (au-delà, submit() bloque).
+    """
+
+    def __init__(self, bank=None, seed=None, workers=4, max_pending=32,
+                 sample_cache_bytes=None, render_cache_bytes=None):
+        # La banque est en lecture seule une fois chargée : elle peut être partagée sans verrou
+        self.bank = bank if bank is not None else get_sound_bank()
+        self.sample_cache = SampleCache(sample_cache_bytes)
+        self.render_cache = RenderCache(render_cache_bytes) if render_cache_bytes else None
+
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bd1-tts")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self, wait=True):
+        """Arrête le pool : les requêtes déjà acceptées sont terminées si wait=True."""
+        self._pool.shutdown(wait=wait)
+
+    def new_seed(self):
+        """Tire la graine d'une requête sans graine (sous verrou : un seul Random partagé)."""
+        with self._rng_lock:
+            return self._rng.getrandbits(64)
+
+    def _sample(self, path):
+        return self.sample_cache.get(path, self.bank)
+
+    def frames(self, message, seed=None, options=None, emotion=None):
+        """Trames PCM (mono 16 bits 44,1 kHz) du message, rendues dans le thread appelant.
+
+        `emotion` impose une émotion à toutes les phrases (sinon détectée phrase par phrase).
+        """
+        if seed is None:
+            seed = self.new_seed()
+        return tts._synthesize_frames(
+            message, random.Random(seed), options, self.bank, self._sample, emotion
+        )
+
+    def synthesize(self, message, seed=None, options=None, emotion=None):
+        """WAV complet du message, rendu dans le thread appelant. Même graine → mêmes octets."""
+        cache = self.render_cache
+        if cache is None or seed is None:
+            return encode_wav(self.frames(message, seed, options, emotion))
+
+        key = (message, emotion, seed, self.bank.fingerprint, tts._prosody(options))
+        audio = cache.get(key)
+        if audio is None:
+            audio = encode_wav(self.frames(message, seed, options, emotion))
+            cache.put(key, audio)
+        return audio
+
+    def stream(self, message, seed=None, options=None, per_chunk=False, emotion=None):
+        """Générateur de blocs PCM, phrase par phrase (voir text_to_speech_v2.synthesize_stream)."""
+        if seed is None:
+            seed = self.new_seed()
+        return tts._stream_frames(
+            message, per_chunk, random.Random(seed), options, self.bank, self._sample, emotion
+        )
+
+    def submit(self, message, seed=None, options=None, timeout=None, emotion=None):
+        """Met une synthèse en file et renvoie un Future (résultat : WAV en octets).
+
+        Si `max_pending` requêtes sont déjà en attente, attend une place libre ; avec
+        `timeout` (secondes, 0 = ne pas attendre), lève queue.Full si aucune place ne se libère.
+        """
+        if not self._slots.acquire(timeout=timeout):
+            raise queue.Full("Trop de synthèses en attente")
+        try:
+            future = self._pool.submit(self.synthesize, message, seed, options, emotion)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda f: self._slots.release())
+        return future
+
+    def synthesize_many(self, messages, seed=0, options=None):
+        """Génère une liste de messages sur le pool (message i → graine seed + i), dans l'ordre."""
+        futures = [self.submit(message, seed + i, options) for i, message in enumerate(messages)]
+        return [future.result() for future in futures]
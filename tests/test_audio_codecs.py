@@ -0,0 +1,53 @@
+"""Tests des encodeurs de audio_codecs.py : FLAC sans perte et tables G.711.
+
+    python -m pytest tests
+"""
+import io
+import os
+import sys
+import warnings
+
+import numpy as np
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from audio_codecs import FLAC_BLOCK_SIZE, encode_flac, lin2alaw, lin2ulaw  # noqa: E402
+
+FRAME_RATE = 44100
+
+# 🔹 Tailles autour des frontières de trame FLAC
+SIZES = (1, FLAC_BLOCK_SIZE - 1, FLAC_BLOCK_SIZE, FLAC_BLOCK_SIZE + 1, 3 * FLAC_BLOCK_SIZE + 17)
+
+
+def _signals(n):
+    rng = np.random.default_rng(n)
+    t = np.arange(n) / FRAME_RATE
+    yield "bruit", rng.integers(-32768, 32768, n, dtype=np.int16)
+    yield "sinus", np.rint(np.sin(2 * np.pi * 440 * t) * 20000).astype(np.int16)
+    yield "extrêmes", np.resize(np.array([-32768, 32767], dtype=np.int16), n)
+    yield "silence", np.zeros(n, dtype=np.int16)
+
+
+@pytest.mark.parametrize("n", SIZES)
+def test_flac_round_trip(n):
+    soundfile = pytest.importorskip("soundfile")
+    for name, pcm in _signals(n):
+        decoded, rate = soundfile.read(io.BytesIO(encode_flac(pcm, FRAME_RATE)), dtype="int16")
+        assert rate == FRAME_RATE, name
+        np.testing.assert_array_equal(decoded, pcm, err_msg=name)
+
+
+def _audioop():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        return pytest.importorskip("audioop")  # Retiré de la bibliothèque standard en Python 3.13
+
+
+def test_g711_tables_match_audioop():
+    audioop = _audioop()
+    pcm = np.arange(-32768, 32768, dtype=np.int16)
+    data = pcm.astype("<i2").tobytes()
+    assert lin2ulaw(pcm).tobytes() == audioop.lin2ulaw(data, 2)
+    assert lin2alaw(pcm).tobytes() == audioop.lin2alaw(data, 2)
@@ -1,14 +1,21 @@
 import os
 import io
 import wave
-import random
 import string
 import re
-import simpleaudio as sa
-from pydub import AudioSegment
 from typing import Any
 import unicodedata
 import threading
+import functools
+import time
+from sound_bank import get_sound_bank, SampleCache, ResampledSampleCache, load_sample, resolve_rng
+from render_cache import RenderCache, is_cacheable_seed
+from pipeline_metrics import PipelineMetrics
+from emotion_lexicon import get_emotion_lexicon
+from playback_engine import PlaybackEngine
+from synthesis_plan import PlanStep, PhrasePlan, SynthesisPlan
+from audio_render import mix_sample_groups, ms_to_frames, encode_wav, CANONICAL_SAMPLE_WIDTH, CANONICAL_FRAME_RATE
+from audio_codecs import encode_audio
 
 # 📂 Définition des dossiers
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -31,6 +38,173 @@ BSP_GROUPS = {
     "S": {"s", "z", "f", "v", "j", "x", "h"},
     "P": {"l", "m", "n", "r"}
 }
+_BSP_LOOKUP = {letter: group for group, letters in BSP_GROUPS.items() for letter in letters}
+
+# 💤 Dépendances importées à la demande : la synthèse en octets n'a besoin que de la
+# bibliothèque standard et de NumPy (pas de backend audio sur les serveurs de rendu).
+def _simpleaudio():
+    import simpleaudio
+    return simpleaudio
+
+# ⏱️ Intervalle de vérification de la fin de lecture (API asyncio)
+PLAYBACK_POLL_INTERVAL = 0.01
+
+# 💾 Cache optionnel des sons décodés (désactivé par défaut)
+_sample_cache = None
+
+def enable_sample_cache(max_bytes=None, preload=False):
+    """Active le cache PCM : tout garder (max_bytes=None) ou LRU limité à max_bytes octets."""
+    global _sample_cache
+    cache = SampleCache(max_bytes)
+    if preload:
+        cache.preload(get_sound_bank())
+    _sample_cache = cache
+    return cache
+
+def disable_sample_cache():
+    global _sample_cache
+    _sample_cache = None
+
+def get_sample_cache():
+    """Renvoie le cache PCM actif, ou None s'il est désactivé."""
+    return _sample_cache
+
+# 💾 Cache optionnel des rendus complets (désactivé par défaut)
+_render_cache = None
+
+def enable_render_cache(max_bytes=64 * 1024 * 1024, cache_dir=None):
+    """Active le cache des rendus de generate_tts_audio, avec persistance optionnelle dans cache_dir.
+
+    Seuls les appels avec une graine fixe (rng entier ou chaîne) sont mis en cache.
+    """
+    global _render_cache
+    _render_cache = RenderCache(max_bytes, cache_dir)
+    return _render_cache
+
+def disable_render_cache():
+    global _render_cache
+    _render_cache = None
+
+def get_render_cache():
+    """Renvoie le cache de rendus actif, ou None s'il est désactivé."""
+    return _render_cache
+
+# ⏱️ Mesures optionnelles du pipeline (désactivées par défaut)
+_metrics = None
+
+def enable_metrics(keep_reports=100):
+    """Active la mesure des temps par étape et des compteurs (lectures de fichiers, sons cherchés)."""
+    global _metrics
+    _metrics = PipelineMetrics(keep_reports)
+    return _metrics
+
+def disable_metrics():
+    global _metrics
+    _metrics = None
+
+def get_metrics():
+    """Renvoie les mesures actives, ou None si elles sont désactivées."""
+    return _metrics
+
+def _timed(stage, func, *args, **kwargs):
+    """Appelle func en ajoutant sa durée à l'étape `stage` (appel direct si les mesures sont désactivées)."""
+    metrics = _metrics
+    if metrics is None:
+        return func(*args, **kwargs)
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        metrics.add_time(stage, time.perf_counter() - start)
+
+def _instrumented(func):
+    """Ouvre un rapport de mesures par appel autour d'un point d'entrée du pipeline."""
+    @functools.wraps(func)
+    def wrapper(message, *args, **kwargs):
+        metrics = _metrics
+        if metrics is None:
+            return func(message, *args, **kwargs)
+        token = metrics.begin(func.__name__, message)
+        try:
+            return func(message, *args, **kwargs)
+        finally:
+            metrics.end(token)
+    return wrapper
+
+def get_sample(path):
+    """Renvoie le PCM décodé (format canonique) d'un son, via le cache s'il est actif."""
+    bank = get_sound_bank()
+    sample = bank.sample(path)
+    if sample is not None:
+        return sample
+    cache = _sample_cache
+    if cache is not None:
+        key = (bank.fingerprint, path)  # Banque rechargée ou remplacée : nouvelles clés
+        sample = cache.lookup(key)
+        if sample is not None:
+            return sample
+
+    metrics = _metrics
+    if metrics is not None:
+        metrics.count("file_opens")
+    sample = load_sample(path)
+    if cache is not None:
+        cache.store(key, sample)
+    return sample
+
+# 📉 Fréquences de sortie possibles (option "sample_rate") ; la banque reste à 44,1 kHz
+OUTPUT_RATES = (8000, 16000, 22050, 44100)
+# Formats compacts de l'option "audio_output" (toute autre valeur donne un WAV 16 bits, comme avant)
+COMPACT_OUTPUTS = ("mulaw", "alaw", "flac")
+
+# 💾 Copies rééchantillonnées de la banque, calculées une fois par son et par fréquence
+# (64 Mo suffisent pour toute la banque aux trois fréquences réduites)
+RESAMPLED_CACHE_BYTES = 64 * 1024 * 1024
+_resampled_cache = ResampledSampleCache(RESAMPLED_CACHE_BYTES)
+
+def get_resampled_cache():
+    """Renvoie le cache des sons rééchantillonnés (stats(), clear())."""
+    return _resampled_cache
+
+def _output_rate(options):
+    frame_rate = int((options or {}).get("sample_rate", CANONICAL_FRAME_RATE))
+    if frame_rate not in OUTPUT_RATES:
+        raise ValueError(f"Fréquence non gérée : {frame_rate} Hz (attendu : {OUTPUT_RATES})")
+    return frame_rate
+
+def _rate_loader(frame_rate):
+    """Fonction chemin -> Sample à la fréquence demandée (copie rééchantillonnée mise en cache)."""
+    if frame_rate == CANONICAL_FRAME_RATE:
+        return get_sample
+    fingerprint = get_sound_bank().fingerprint  # Banque rechargée : nouvelles clés, pas de copie périmée
+    return lambda path: _resampled_cache.get(path, frame_rate, get_sample, fingerprint)
+
+# 🎼 Options de prosodie (en millisecondes, 0 par défaut = sons collés comme avant)
+PROSODY_OPTIONS = ("word_gap_ms", "phrase_gap_ms", "crossfade_ms")
+PROSODY_MAX_MS = 5000  # Au-delà, ce n'est plus une pause mais un tampon énorme à allouer
+
+def _prosody(options, frame_rate=CANONICAL_FRAME_RATE):
+    """(silence entre mots, silence entre phrases, fondu) en trames, d'après les options.
+
+    Lève ValueError si une durée n'est pas un nombre fini entre 0 et PROSODY_MAX_MS.
+    """
+    options = options or {}
+    frames = []
+    for name in PROSODY_OPTIONS:
+        ms = options.get(name, 0)
+        try:
+            ms = float(ms)
+        except (TypeError, ValueError):
+            raise ValueError(f"'{name}' doit être un nombre, pas {ms!r}") from None
+        if not 0 <= ms <= PROSODY_MAX_MS:  # Faux aussi pour NaN
+            raise ValueError(f"'{name}' doit être compris entre 0 et {PROSODY_MAX_MS} ms, pas {ms!r}")
+        frames.append(ms_to_frames(ms, frame_rate))
+    return tuple(frames)
+
+def render_samples(samples, options=None, frame_rate=CANONICAL_FRAME_RATE):
+    """Assemble les sons d'une phrase en un seul bloc PCM, écrit d'un coup dans un tableau préalloué."""
+    word_gap, _, crossfade = _prosody(options, frame_rate)
+    return _timed("concat", mix_sample_groups, [samples], word_gap, 0, crossfade).tobytes()
 
 def process_message_by_phrases(message):
     """Découpe un message en phrases, nettoie les apostrophes/tirets, et attribue une émotion à chaque phrase."""
@@ -62,126 +236,177 @@ def process_message_by_phrases(message):
 
     return structured_text
 
-def decompose_message(message):
-    def _extract_consonnes(message, min_word_len):
-        vowels = "aeiou"
-        consonnes = []
-        exceptions = {}  # {"je", "tu", "il", "on", "yo"}
-        force_include = {}  # {"bd-1"}
-
-        words = message.split()
-
-        for word in words:
-            cleaned = word.strip(string.punctuation)
-
-            if cleaned in force_include:
-                for c in cleaned:
-                    if c.isalpha() and c not in vowels:
-                        consonnes.append(c)
-                consonnes.append(' ')
-                continue
-
-            if len(cleaned) <= min_word_len and cleaned not in exceptions:
-                continue
-
-            i = 0
-            while i < len(cleaned) - 1:
-                c1 = cleaned[i]
-                c2 = cleaned[i + 1]
-
-                if c2 in vowels and c1.isalpha() and c1 not in vowels:
-                    j = i - 1
-                    stack = [c1]
-                    while j >= 0 and cleaned[j].isalpha() and cleaned[j] not in vowels:
-                        stack.insert(0, cleaned[j])
-                        j -= 1
-                    consonnes.extend(stack)
-                    i += 2
-                else:
-                    i += 1
+# 🎭 Émotions disponibles dans la banque de sons
+EMOTIONS = ("neutre", "positif", "negatif", "question", "surprise", "triste")
 
-            consonnes.append(' ')
-        return consonnes
+# 🔤 Front-end texte de decompose_message
+VOWELS = "aeiou"
+WORD_LEN_THRESHOLDS = (5, 4, 3)  # Mots de +5 lettres, sinon +4, sinon +3
+EXCEPTIONS = {}  # {"je", "tu", "il", "on", "yo"}
+FORCE_INCLUDE = {}  # {"bd-1"}
+
+class _NormalizeTable(dict):
+    """Table str.translate : apostrophe → espace, accents supprimés (NFD sans les marques Mn).
+
+    Chaque caractère n'est décomposé qu'une fois, puis mémorisé dans la table.
+    """
+
+    def __missing__(self, code):
+        char = chr(code)
+        if char == "'":
+            value = " "
+        else:
+            value = ''.join(
+                c for c in unicodedata.normalize('NFD', char)
+                if unicodedata.category(c) != 'Mn'
+            )
+        self[code] = value
+        return value
+
+_NORMALIZE_TABLE = _NormalizeTable()
+
+@functools.lru_cache(maxsize=4096)
+def _word_consonnes(cleaned):
+    """Consonnes gardées d'un mot : chaque groupe de consonnes suivi d'une voyelle (dr, gn, mp...)."""
+    consonnes = []
+    run_start = -1
+
+    for k, c in enumerate(cleaned):
+        if c in VOWELS:
+            if run_start >= 0:
+                consonnes.extend(cleaned[run_start:k])
+            run_start = -1
+        elif c.isalpha():
+            if run_start < 0:
+                run_start = k
+        else:
+            run_start = -1
 
-    # 🔹 Minuscule + suppression des accents
-    message = message.lower()
-    message = message.replace("'", " ")
-    message = ''.join(
-        c for c in unicodedata.normalize('NFD', message)
-        if unicodedata.category(c) != 'Mn'
-    )
+    return tuple(consonnes)
 
-    # 🔹 Première passe (mots de +5 lettres)
-    consonnes = _extract_consonnes(message, min_word_len=5)
+def decompose_message(message):
+    # 🔹 Minuscule + suppression des accents, en une seule passe
+    message = message.lower().translate(_NORMALIZE_TABLE)
+
+    # 🔹 Découpage unique en mots : (longueur, consonnes), une longueur infinie = toujours gardé
+    words = []
+    for word in message.split():
+        cleaned = word.strip(string.punctuation)
+
+        if cleaned in FORCE_INCLUDE:
+            words.append((float("inf"), tuple(c for c in cleaned if c.isalpha() and c not in VOWELS)))
+        elif cleaned in EXCEPTIONS:
+            words.append((float("inf"), _word_consonnes(cleaned)))
+        else:
+            words.append((len(cleaned), _word_consonnes(cleaned)))
 
-    # 🔹 Seconde passe si vide (mots de +4 lettres)
-    if not [c for c in consonnes if c.strip()]:
-        consonnes = _extract_consonnes(message, min_word_len=4)
+    # 🔹 Seuil le plus exigeant (mots de +5, puis +4, puis +3 lettres) qui donne au moins une consonne
+    for min_word_len in WORD_LEN_THRESHOLDS:
+        if any(length > min_word_len and consonnes for length, consonnes in words):
+            break
 
-        # 🔹 Seconde passe si vide (mots de +3 lettres)
-        if not [c for c in consonnes if c.strip()]:
-            consonnes = _extract_consonnes(message, min_word_len=3)
+    consonnes = []
+    for length, word_consonnes in words:
+        if length > min_word_len:
+            consonnes.extend(word_consonnes)
+            consonnes.append(' ')
 
     return consonnes
 
 def assign_emotion(phrase):
-    """Détecte l'émotion d'une phrase."""
+    """Détecte l'émotion d'une phrase : ponctuation, puis mots du lexique (emotion_lexicon.txt)."""
     phrase = phrase.strip()
     if "?" in phrase:
         return "question"
-    elif any(word in phrase.lower() for word in ["non", "triste", "pas"]):
-        return "negatif"
-    elif any(word in phrase.lower() for word in ["oui", "super", "merci"]):
-        return "positif"
+
+    # 🔹 Mots entiers uniquement ("pas" ne trouve pas "passer"), un seul passage sur la phrase
+    emotion = get_emotion_lexicon().best(phrase)
+    if emotion is not None:
+        return emotion
     elif "!" in phrase:
         return "surprise"
     else:
         return "neutre"
 
-def get_random_variant(folder, consonne, used_variants):
-    if not os.path.exists(folder):
-        return None
-
+def get_random_variant(folder, consonne, used_variants, rng=None):
     variants = [
-        f for f in os.listdir(folder)
-        if f.lower().startswith(consonne.lower()) and f.endswith(".wav") and f not in used_variants
+        f for f in get_sound_bank().folder_variants(folder, consonne)
+        if f not in used_variants
     ]
 
     if variants: #Ne pas répéter le meme son 2 fois
-        chosen = random.choice(variants)
+        chosen = resolve_rng(rng).choice(variants)
         used_variants.add(chosen)
         return os.path.join(folder, chosen)
     return None
 
-def get_sound(consonne, emotion="neutre", used_variants=None):
+def get_sound(consonne, emotion="neutre", used_variants=None, rng=None):
     if consonne == ' ':
         return None, None
 
     if used_variants is None:
         used_variants = set()
 
-    emotion_folder = os.path.join(EMOTIONS_DIR, emotion)
-    sound_path = get_random_variant(emotion_folder, consonne, used_variants)
+    bank = get_sound_bank()
+    rng = resolve_rng(rng)
+    sound_path = bank.choose(1, None, emotion, consonne, used_variants, rng)
 
     if not sound_path:
-        sound_path = get_random_variant(CONSONNES_DIR, consonne, used_variants)
+        sound_path = bank.choose(1, None, None, consonne, used_variants, rng)
         emotion = "neutre"
 
     return sound_path, emotion
 
 def map_letters_to_sound_groups(text):
-    result = []
-    for c in text:
-        c_lower = c.lower()
-        for group, letters in BSP_GROUPS.items():
-            if c_lower in letters:
-                result.append(group)
-                break
-        else:
-            result.append(c_lower)
-    return result
-
-def get_sound_chunked(message, emotion="neutre", max_chunk=4):
+    return [_BSP_LOOKUP.get(c_lower, c_lower) for c_lower in map(str.lower, text)]
+
+# 🧠 Mémo des sons possibles par mot : seul le tirage de la variante reste à faire par requête
+WORD_PLAN_MEMO_SIZE = 8192
+
+def _word_options(bank, word, emotion, emotion_or, max_chunk):
+    """Sons possibles d'un mot, dans l'ordre où ils sont essayés.
+
+    Chaque option : (dossier, variantes, longueur du chunk, émotion utilisée, lettres, passe en neutre).
+    Le mémo est rangé dans la banque : il disparaît avec elle (reload(), set_sound_bank()).
+    """
+    memo = bank.word_memo()
+    key = (word, emotion, emotion_or, max_chunk)
+    options = memo.get(key)
+    if options is None:
+        if len(memo) >= WORD_PLAN_MEMO_SIZE:
+            memo.clear()  # Textes très variés : on repart de zéro plutôt que de grossir sans fin
+        options = memo[key] = _find_word_options(bank, word, emotion, emotion_or, max_chunk)
+    return options
+
+def _find_word_options(bank, word, emotion, emotion_or, max_chunk):
+    mapped = map_letters_to_sound_groups(word)
+    options = []
+
+    # 🔹 Chunks existants dans la banque, du plus long au plus court ; pour chacun l'émotion puis neutre
+    for chunk_len, pattern, prefix in bank.composition_chunks(mapped, 0, min(max_chunk, len(mapped))):
+        original = "".join(word[:chunk_len])
+        folder, names = bank.variants(chunk_len, pattern, emotion, prefix)
+        if names:
+            options.append((folder, names, chunk_len, emotion, original, False))
+        if emotion != "neutre":
+            folder, names = bank.variants(chunk_len, pattern, "neutre", prefix)
+            if names:
+                options.append((folder, names, chunk_len, "neutre", original, True))
+
+    # 🔹 Fallback : son d'une seule lettre (émotion d'origine, puis consonnes neutres)
+    original_char = word[0].lower()
+    for key_emotion, used_emotion in ((emotion_or, emotion_or), (None, "neutre")):
+        folder, names = bank.variants(1, None, key_emotion, original_char)
+        if names:
+            options.append((folder, names, 1, used_emotion, original_char, False))
+
+    return tuple(options)
+
+def get_sound_chunked(message, emotion="neutre", max_chunk=4, rng=None, bank=None):
+    """Choisit un son par mot ; renvoie une liste de PlanStep (chemin, émotion, longueur, lettres)."""
+    if bank is None:
+        bank = get_sound_bank()
+    rng = resolve_rng(rng)
     mapped = map_letters_to_sound_groups(message)
     i = 0
     results = []
@@ -194,144 +419,304 @@ def get_sound_chunked(message, emotion="neutre", max_chunk=4):
             continue
 
         # Trouver la fin du mot courant (jusqu'au prochain espace)
-        word_end = i
-        while word_end < len(mapped) and mapped[word_end] != " ":
-            word_end += 1
-
-        chunk_found = False
-
-        for chunk_len in range(min(max_chunk, word_end - i), 0, -1):
-            chunk = mapped[i:i + chunk_len]
-
-            # 🔹 Fallback dès le début si chunk_len == 1
-            if chunk_len == 1:
-                original_char = message[i].lower()
-                emotion_folder = os.path.join(EMOTIONS_DIR, emotion_or)
-                path = get_random_variant(emotion_folder, original_char, used_variants)
-                used_emotion = emotion_or
-
-                if not path:
-                    path = get_random_variant(CONSONNES_DIR, original_char, used_variants)
-                    used_emotion = "neutre"
-
-                if path:
-                    used_variants.add(os.path.basename(path))
-                    results.append((path, used_emotion, 1, original_char))
-                else:
-                    print(f"❌ Aucun son trouvé pour caractère : '{original_char}'")
-
-                i = word_end  # 🔁 Même en fallback, passer au mot suivant
-                chunk_found = True
-                break
-
-            if not all(c in ["B", "S", "P"] for c in chunk):
-                continue
-
-            pattern = " ".join({"B": "Beep", "S": "Sifflement", "P": "Piano"}[c] for c in chunk)
-            prefix = "".join(chunk)
-            expected_filename = prefix + ".wav"
-
-            folder_path = os.path.join(
-                SOUNDS_DIR, "compositions", f"{chunk_len}_caracteres", pattern, emotion
-            )
-
-            path = get_random_variant(folder_path, prefix, used_variants)
-
-            if not path and emotion != "neutre":
-                folder_path = os.path.join(
-                    SOUNDS_DIR, "compositions", f"{chunk_len}_caracteres", pattern, "neutre"
-                )
-                path = get_random_variant(folder_path, prefix, used_variants)
-                if path:
+        try:
+            word_end = mapped.index(" ", i)
+        except ValueError:
+            word_end = len(mapped)
+
+        word = tuple(message[i:word_end])
+        options = _word_options(bank, word, emotion, emotion_or, max_chunk)
+
+        # 🎲 Première option ayant encore une variante jamais jouée dans la phrase
+        for folder, names, chunk_len, used_emotion, original, to_neutral in options:
+            candidates = [f for f in names if f not in used_variants]
+            if candidates: #Ne pas répéter le meme son 2 fois
+                chosen = rng.choice(candidates)
+                used_variants.add(chosen)
+                results.append(PlanStep(os.path.join(folder, chosen), used_emotion, chunk_len, original))
+                if to_neutral:
                     emotion = "neutre"
-
-            if path:
-                used_variants.add(os.path.basename(path))
-                results.append((path, emotion, chunk_len, message[i:i + chunk_len]))
-                i = word_end  # 🔁 Une fois le chunk utilisé, on saute le mot entier
-                chunk_found = True
                 break
+        else:
+            print(f"❌ Aucun son trouvé pour caractère : '{word[0].lower()}'")
 
-        if not chunk_found:
-            i = word_end  # 🔁 Sauter au mot suivant même si rien trouvé
+        i = word_end  # 🔁 Une fois le chunk utilisé (ou le fallback), on saute le mot entier
 
     return results
 
-def generate_tts_audio(message: str, options: dict[str, Any]) -> tuple[str, bytes]:
-    """Génère un fichier audio à partir du message en assemblant les sons correspondants."""
-
-    emotion = assign_emotion(message)
-    consonnes = decompose_message(message)
+def render_phrase_samples(message, rng=None, bank=None, sample_loader=None, emotion=None):
+    """Sélectionne les sons d'une phrase et renvoie leur PCM décodé (liste de Sample, sans assemblage).
+
+    `bank` et `sample_loader` (chemin -> Sample) remplacent la banque et le cache globaux ;
+    `emotion` impose l'émotion au lieu de la détecter.
+    """
+    if sample_loader is None:
+        sample_loader = get_sample
+    if emotion is None:
+        emotion = assign_emotion(message)
+    consonnes = _timed("decompose", decompose_message, message)
     #print(f"🔡 **Consonnes extraites** : {consonnes}")
 
-    chunks = get_sound_chunked(consonnes, emotion)
-
-    final_audio = AudioSegment.silent(duration=0)
-    total_duration = 0
+    chunks = _timed("chunking", get_sound_chunked, consonnes, emotion, rng=rng, bank=bank)
+    metrics = _metrics
+    if metrics is not None:
+        metrics.count("sample_lookups", len(chunks))
+        start = time.perf_counter()
+    samples = []
 
     #print("┌────────┬──────────────────────────┬───────────┬──────────────────────────────────────────────┐")
     #print("│ Lettre │       Fichier WAV         │ Émotion   │                     Path                    │")
     #print("├────────┼──────────────────────────┼───────────┼──────────────────────────────────────────────┤")
 
-    message_letters = list(message)
-    msg_index = 0
-
     for path, emo_used, size, original in chunks:
         if path:
-            audio = AudioSegment.from_wav(path)
-            final_audio += audio
-            total_duration += len(audio) / 1000
+            samples.append(sample_loader(path))
             #print(f"│   {''.join(original):<10}   │ {os.path.basename(path):<24} │ {emo_used:<9} │ {path} │")
         #else:
             #print(f"│   {''.join(original):<10}   │ ❌ AUCUN SON TROUVÉ         │ {emo_used:<9} │ ❌ Aucun fichier trouvé │")
 
     #print("└────────┴──────────────────────────┴───────────┴──────────────────────────────────────────────┘\n")
 
-    # Sauvegarde en mémoire
-    output_stream = io.BytesIO()
-    output_file = wave.open(output_stream, "wb")
-    output_file.setnchannels(1)
-    output_file.setsampwidth(2)
-    output_file.setframerate(44100)
-    output_file.writeframes(final_audio.raw_data)
-    output_file.close()
-
-    byte_array = output_stream.getvalue()
+    if metrics is not None:
+        metrics.add_time("sample_load", time.perf_counter() - start)
+    return samples
+
+@_instrumented
+def generate_tts_audio(message: str, options: dict[str, Any], rng=None) -> tuple[str, bytes]:
+    """Génère un fichier audio à partir du message en assemblant les sons correspondants.
+
+    `rng` (graine ou random.Random) rend le choix des variantes reproductible.
+    Les options "word_gap_ms" et "crossfade_ms" règlent les silences / fondus entre les mots,
+    "sample_rate" la fréquence de sortie (OUTPUT_RATES) et "audio_output" le format :
+    "wav" / "raw" (WAV 16 bits), "mulaw" / "alaw" (WAV G.711 8 bits) ou "flac".
+    """
+    frame_rate = _output_rate(options)
+    audio_output = options.get("audio_output")
+    codec = audio_output if audio_output in COMPACT_OUTPUTS else "wav"
+    emotion = assign_emotion(message)  # Détectée une seule fois (clé de cache et rendu)
+
+    def render():
+        samples = render_phrase_samples(message, rng, sample_loader=_rate_loader(frame_rate), emotion=emotion)
+        return _timed("encode", encode_audio, render_samples(samples, options, frame_rate), codec, frame_rate)
+
+    cache = _render_cache
+    if cache is not None and is_cacheable_seed(rng):
+        key = (message, emotion, rng, get_sound_bank().fingerprint, _prosody(options),
+               frame_rate, codec)
+        byte_array = cache.get(key)
+        if byte_array is None:
+            byte_array = render()
+            cache.put(key, byte_array)
+    else:
+        # Sauvegarde en mémoire
+        byte_array = render()
 
-    if options.get("audio_output") == "wav":
+    if codec in COMPACT_OUTPUTS:
+        return (codec, byte_array)
+    if audio_output == "wav":
         return ("wav", byte_array)
     return ("raw", byte_array)
 
-def tts_bd1(message: str):
-    """Génère et joue un son à partir du message, en adaptant l’émotion à chaque phrase."""
+def _synthesize_frames(message, rng=None, options=None, bank=None, sample_loader=None, emotion=None):
+    """Génère les trames PCM (mono 16 bits 44,1 kHz) de toutes les phrases du message."""
+    rng = resolve_rng(rng)
+    structured_text = _timed("phrases", process_message_by_phrases, message)
+    # L'émotion de chaque phrase, déjà détectée au découpage, est transmise telle quelle
+    groups = [
+        render_phrase_samples(phrase, rng, bank, sample_loader, emotion or phrase_emotion)
+        for phrase, phrase_emotion in structured_text
+    ]
 
-    structured_text = process_message_by_phrases(message)
-    final_audio = AudioSegment.silent(duration=0)
+    # 🔗 Un seul assemblage pour tout le message (silences et fondus compris)
+    return _timed("concat", mix_sample_groups, groups, *_prosody(options)).tobytes()
 
-    for phrase, emotion in structured_text:
+@_instrumented
+def synthesize(message: str, rng=None, options=None) -> bytes:
+    """Génère le son complet du message (WAV en mémoire) sans le jouer.
 
-        options = {"audio_output": "wav"}
-        format, audio_data = generate_tts_audio(phrase, options)
+    Avec une même graine `rng`, un même message donne toujours les mêmes octets.
+    `options` accepte "word_gap_ms", "phrase_gap_ms" et "crossfade_ms" (0 par défaut).
+    """
+    return _timed("encode", encode_wav, _synthesize_frames(message, rng, options))
 
-        temp_stream = io.BytesIO(audio_data)
-        phrase_audio = AudioSegment.from_file(temp_stream, format="wav")
+def synthesize_stream(message: str, per_chunk: bool = False, rng=None, options=None):
+    """Génère le PCM du message au fil de l'eau : une phrase (ou un son si per_chunk) à la fois.
 
-        final_audio += phrase_audio
-        
-    output_path = os.path.join(BASE_DIR, "temp_tts.wav")
-    with open(output_path, "wb") as f:
-        final_audio.export(f, format="wav")
+    Chaque bloc est du PCM mono 16 bits 44,1 kHz ; leur concaténation donne exactement
+    les trames de synthesize() (les silences sont envoyés comme des blocs à part).
+    Avec un fondu enchaîné, per_chunk est ignoré : chaque phrase est envoyée d'un bloc.
+    """
+    return _stream_frames(message, per_chunk, rng, options)
 
-    with open(output_path, "rb") as f:
-        audio_buffer = io.BytesIO(f.read())
+def _stream_frames(message, per_chunk=False, rng=None, options=None, bank=None, sample_loader=None, emotion=None):
+    rng = resolve_rng(rng)
+    word_gap, phrase_gap, crossfade = _prosody(options)
+    first_phrase = True
 
-    try:
-        os.remove(output_path)
-        #print(f"🗑️ Fichier `{output_path}` supprimé après chargement en mémoire.")
-    except Exception as e:
-        print(e)
-        #print(f"❌ Erreur lors de la suppression du fichier `{output_path}` : {e}")
-
-    wave_obj = sa.WaveObject.from_wave_read(wave.open(audio_buffer, "rb"))
-    play_obj = wave_obj.play()
+    for phrase, phrase_emotion in _timed("phrases", process_message_by_phrases, message):
+        samples = render_phrase_samples(phrase, rng, bank, sample_loader, emotion or phrase_emotion)
+        if not samples:
+            continue
+
+        if not first_phrase and phrase_gap:
+            yield bytes(phrase_gap * CANONICAL_SAMPLE_WIDTH)
+        first_phrase = False
+
+        if per_chunk and not crossfade:
+            for k, sample in enumerate(samples):
+                if k and word_gap:
+                    yield bytes(word_gap * CANONICAL_SAMPLE_WIDTH)
+                yield bytes(sample.data)
+        else:
+            yield render_samples(samples, options)
+
+@_instrumented
+def tts_bd1(message: str, rng=None, options=None):
+    """Génère et joue un son à partir du message, en adaptant l’émotion à chaque phrase."""
+
+    frames = _synthesize_frames(message, rng, options)
+    if not frames:
+        return
+
+    # 🔊 Lecture directe du PCM en mémoire (aucun fichier temporaire)
+    _timed("playback", _play_and_wait, frames)
+
+def _play_and_wait(frames):
+    play_obj = _simpleaudio().play_buffer(frames, 1, 2, 44100)
     play_obj.wait_done()
+
+@_instrumented
+def speak_stream(message: str, rng=None, options=None):
+    """Joue le message phrase par phrase : le son démarre dès que la première phrase est prête."""
+    play_obj = None
+
+    for frames in synthesize_stream(message, rng=rng, options=options):
+        # La phrase suivante est préparée pendant que la précédente est jouée
+        if play_obj is not None:
+            _timed("playback", play_obj.wait_done)
+        play_obj = _timed("playback", _simpleaudio().play_buffer, frames, 1, 2, 44100)
+
+    if play_obj is not None:
+        _timed("playback", play_obj.wait_done)
+
+# 🔈 Moteur de lecture persistant (ouvert au premier usage)
+_playback_engine = None
+_playback_engine_lock = threading.Lock()
+
+def get_playback_engine():
+    """Renvoie le moteur de lecture partagé ; la sortie audio n'est ouverte qu'une fois."""
+    global _playback_engine
+    if _playback_engine is None:
+        with _playback_engine_lock:
+            if _playback_engine is None:
+                _playback_engine = PlaybackEngine()
+    return _playback_engine
+
+def set_playback_engine(engine):
+    """Remplace le moteur partagé (ex. : PlaybackEngine(NullSink()) pour les tests sans carte son)."""
+    global _playback_engine
+    with _playback_engine_lock:
+        _playback_engine = engine
+
+def speak_queued(message: str, rng=None, options=None, interrupt=False):
+    """Met le message en file sur le moteur persistant et rend la main tout de suite.
+
+    Les messages s'enchaînent sans trou ; interrupt=True coupe ce qui est en cours (barge-in).
+    Renvoie l'Utterance : .wait() pour attendre la fin, .cancel() pour couper.
+    """
+    engine = get_playback_engine()
+    audio = synthesize_stream(message, rng=rng, options=options)
+    return engine.barge_in(audio) if interrupt else engine.play(audio)
+
+def plan_message(message: str, rng=None, emotion=None) -> SynthesisPlan:
+    """Choisit tous les sons du message sans les décoder. Le plan se sérialise (to_json) et se rend avec render_plan()."""
+    rng = resolve_rng(rng)
+    phrases = []
+    for phrase, phrase_emotion in process_message_by_phrases(message):
+        phrase_emotion = emotion or phrase_emotion
+        steps = get_sound_chunked(decompose_message(phrase), phrase_emotion, rng=rng)
+        phrases.append(PhrasePlan(phrase, phrase_emotion, steps))
+    return SynthesisPlan(phrases)
+
+def render_plan(plan: SynthesisPlan, options=None) -> bytes:
+    """Assemble un plan (éventuellement relu depuis JSON) en WAV ; même plan → mêmes octets que synthesize().
+
+    Lève ValueError si le plan cite des sons absents de la banque actuelle (plan fait avec une autre banque).
+    """
+    bank = get_sound_bank()
+    missing = [step.path for step in plan.steps() if step.path not in bank]
+    if missing:
+        raise ValueError(
+            f"{len(missing)} son(s) du plan absent(s) de la banque actuelle (plan fait avec un autre pack ?) : "
+            f"{os.path.relpath(missing[0], bank.sounds_dir)}"
+        )
+    groups = [[get_sample(step.path) for step in phrase.steps] for phrase in plan.phrases]
+    frames = _timed("concat", mix_sample_groups, groups, *_prosody(options)).tobytes()
+    return _timed("encode", encode_wav, frames)
+
+async def synthesize_async(message: str, executor=None, rng=None, options=None) -> bytes:
+    """Version asyncio de synthesize() : le rendu tourne dans un exécuteur, pas dans la boucle."""
+    import asyncio
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, synthesize, message, rng, options)
+
+async def play_async(audio: bytes, executor=None):
+    """Joue un WAV en mémoire et attend la fin de la lecture sans bloquer la boucle."""
+    import asyncio
+    with wave.open(io.BytesIO(audio), "rb") as wav_file:
+        params = (wav_file.getnchannels(), wav_file.getsampwidth(), wav_file.getframerate())
+        frames = wav_file.readframes(wav_file.getnframes())
+    if not frames:
+        return
+
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    play_obj = await loop.run_in_executor(executor, _simpleaudio().play_buffer, frames, *params)
+    try:
+        while play_obj.is_playing():
+            await asyncio.sleep(PLAYBACK_POLL_INTERVAL)
+    except asyncio.CancelledError:
+        # 🛑 Tâche annulée : couper le son immédiatement
+        play_obj.stop()
+        raise
+    finally:
+        metrics = _metrics
+        if metrics is not None:
+            metrics.add_time("playback", time.perf_counter() - start)
+
+async def speak_async(message: str, executor=None, rng=None, options=None):
+    """Version asyncio de tts_bd1().
+
+    Plusieurs messages peuvent être préparés en parallèle pendant qu'un autre est joué :
+        prochain = asyncio.create_task(synthesize_async(suivant))
+        await speak_async(message)
+        await play_async(await prochain)
+    """
+    await play_async(await synthesize_async(message, executor, rng, options), executor)
+
+def _batch_worker_init():
+    """Initialise un processus de synthesize_batch : banque de sons et cache PCM chargés une fois."""
+    bank = get_sound_bank()
+    if _sample_cache is None and not bank.pack_path:
+        enable_sample_cache()  # Avec un pack, les sons sont déjà servis par le mmap
+
+def _batch_synthesize(job):
+    message, seed, options = job
+    return synthesize(message, rng=seed, options=options)
+
+def synthesize_batch(messages, workers=None, seed=0, options=None):
+    """Génère une liste de messages en parallèle sur un pool de processus.
+
+    Le message d'indice i utilise la graine `seed + i` : le résultat est identique
+    quel que soit le nombre de workers. Renvoie les WAV dans l'ordre des messages.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    jobs = [(message, seed + i, options) for i, message in enumerate(messages)]
+    if not jobs:
+        return []
+
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_batch_worker_init) as pool:
+        return list(pool.map(_batch_synthesize, jobs, chunksize=chunksize))
@@ -0,0 +1,235 @@
+"""Serveur HTTP local de synthèse BD-1 : la banque de sons est chargée une seule fois pour tous les clients.
+
+    python tts_server.py [--host 127.0.0.1] [--port 8765] [--max-concurrent 8] [--pack sounds.pack]
+
+Requêtes (HTTP/1.1, connexions persistantes) :
+- POST /synthesize avec un corps JSON {"text": ..., "emotion": ..., "seed": ..., "format": "wav" | "pcm",
+  "word_gap_ms": ..., "phrase_gap_ms": ..., "crossfade_ms": ...}
+- GET /synthesize?text=...&emotion=...&seed=...&format=...
+- GET /health
+
+La réponse est envoyée en Transfer-Encoding: chunked, un bloc par phrase dès qu'elle est rendue.
+"pcm" = PCM brut mono 16 bits little-endian 44,1 kHz ; "wav" = même flux précédé d'un en-tête WAV
+de longueur inconnue. L'en-tête X-BD1-Seed donne la graine utilisée (même graine → mêmes octets).
+"""
+import json
+import argparse
+import threading
+import http.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, urlencode
+
+from sound_bank import SoundBank, get_sound_bank
+from audio_render import wav_stream_header
+from synthesizer import BD1Synthesizer
+from text_to_speech_v2 import EMOTIONS, PROSODY_OPTIONS, _prosody
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+FORMATS = {"wav": "audio/wav", "pcm": "application/octet-stream"}
+PCM_FORMAT = "s16le;rate=44100;channels=1"
+
+# ⏱️ Attente max d'une place de rendu avant de répondre 503, et délai d'inactivité d'une connexion
+QUEUE_TIMEOUT = 5.0
+IDLE_TIMEOUT = 30
+
+
+class RequestError(ValueError):
+    """Requête invalide : renvoyée au client en 400 avec le message."""
+
+
+def parse_request(params):
+    """Valide les paramètres d'une requête. Renvoie (texte, émotion, graine, format, options)."""
+    text = params.get("text")
+    if not isinstance(text, str):
+        raise RequestError("'text' manquant")
+
+    emotion = params.get("emotion") or None
+    if emotion is not None and emotion not in EMOTIONS:
+        raise RequestError(f"Émotion inconnue : {emotion!r} (attendu : {', '.join(EMOTIONS)})")
+
+    seed = params.get("seed")
+    if seed is not None:
+        try:
+            seed = int(seed)
+        except (TypeError, ValueError):
+            raise RequestError("'seed' doit être un entier") from None
+
+    audio_format = params.get("format") or "wav"
+    if audio_format not in FORMATS:
+        raise RequestError(f"Format inconnu : {audio_format!r} (attendu : wav, pcm)")
+
+    options = {}
+    for name in PROSODY_OPTIONS:
+        if params.get(name) is not None:
+            try:
+                options[name] = float(params[name])
+            except (TypeError, ValueError):
+                raise RequestError(f"'{name}' doit être un nombre") from None
+    try:
+        _prosody(options)  # Durées finies et bornées : refusées ici, avant l'envoi des en-têtes
+    except ValueError as e:
+        raise RequestError(str(e)) from None
+
+    return text, emotion, seed, audio_format, options
+
+
+class TTSRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Connexions persistantes (keep-alive) et réponses chunked
+    timeout = IDLE_TIMEOUT
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/health":
+            self._send_json(200, {"status": "ok", "samples": len(self.server.synthesizer.bank)})
+        elif url.path == "/synthesize":
+            self._synthesize({name: values[-1] for name, values in parse_qs(url.query).items()})
+        else:
+            self._send_json(404, {"error": "Chemin inconnu"})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if url.path != "/synthesize":
+            self._send_json(404, {"error": "Chemin inconnu"})
+            return
+        try:
+            params = json.loads(body or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": "Corps JSON invalide"})
+            return
+        if not isinstance(params, dict):
+            self._send_json(400, {"error": "Le corps JSON doit être un objet"})
+            return
+        self._synthesize(params)
+
+    def _synthesize(self, params):
+        try:
+            text, emotion, seed, audio_format, options = parse_request(params)
+        except RequestError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        # 🚦 Nombre de rendus simultanés borné : au-delà, le client réessaiera plus tard
+        slots = self.server.render_slots
+        if not slots.acquire(timeout=QUEUE_TIMEOUT):
+            self._send_json(503, {"error": "Serveur occupé"}, {"Retry-After": "1"})
+            return
+
+        try:
+            synthesizer = self.server.synthesizer
+            if seed is None:
+                seed = synthesizer.new_seed()
+            chunks = synthesizer.stream(text, seed, options, emotion=emotion)
+
+            self.send_response(200)
+            self.send_header("Content-Type", FORMATS[audio_format])
+            self.send_header("Transfer-Encoding", "chunked")
+            self.send_header("X-BD1-Seed", str(seed))
+            self.send_header("X-BD1-PCM-Format", PCM_FORMAT)
+            self.end_headers()
+
+            if audio_format == "wav":
+                self._write_chunk(wav_stream_header())
+            for frames in chunks:
+                self._write_chunk(frames)
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # Client parti en cours de route : on abandonne le rendu et la connexion
+            self.close_connection = True
+        finally:
+            slots.release()
+
+    def _write_chunk(self, data):
+        # Un bloc vide terminerait la réponse : on ne l'envoie pas
+        if data:
+            self.wfile.write(b"%X\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT, synthesizer=None, max_concurrent=8, verbose=False):
+    """Crée le serveur (sans le démarrer). port=0 choisit un port libre (voir server.server_address)."""
+    server = ThreadingHTTPServer((host, port), TTSRequestHandler)
+    server.synthesizer = synthesizer if synthesizer is not None else BD1Synthesizer()
+    server.render_slots = threading.BoundedSemaphore(max_concurrent)
+    server.verbose = verbose
+    return server
+
+
+class TTSClient:
+    """Client minimal du serveur, sur une seule connexion persistante (pas thread-safe)."""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=30):
+        self.connection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def stream(self, text, emotion=None, seed=None, audio_format="wav", **options):
+        """Générateur des blocs reçus (le premier arrive dès que la première phrase est rendue)."""
+        params = {"text": text, "emotion": emotion, "seed": seed, "format": audio_format, **options}
+        body = json.dumps({k: v for k, v in params.items() if v is not None}).encode("utf-8")
+        self.connection.request("POST", "/synthesize", body, {"Content-Type": "application/json"})
+        response = self.connection.getresponse()
+        if response.status != 200:
+            message = json.loads(response.read() or b"{}").get("error", response.reason)
+            raise RuntimeError(f"Erreur {response.status} du serveur : {message}")
+        while True:
+            data = response.read1(65536)
+            if not data:
+                break
+            yield data
+
+    def synthesize(self, text, emotion=None, seed=None, audio_format="wav", **options):
+        """Réponse complète en octets."""
+        return b"".join(self.stream(text, emotion, seed, audio_format, **options))
+
+
+def synthesize_url(text, host=DEFAULT_HOST, port=DEFAULT_PORT, **params):
+    """URL GET équivalente (pratique pour curl ou un navigateur)."""
+    query = urlencode({"text": text, **{k: v for k, v in params.items() if v is not None}})
+    return f"http://{host}:{port}/synthesize?{query}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-concurrent", type=int, default=8, help="Rendus simultanés au maximum")
+    parser.add_argument("--pack", help="Charger la banque depuis un pack précompilé")
+    parser.add_argument("--verbose", action="store_true", help="Journaliser chaque requête")
+    args = parser.parse_args()
+
+    bank = SoundBank.from_pack(args.pack) if args.pack else get_sound_bank()
+    server = make_server(
+        args.host, args.port, BD1Synthesizer(bank), args.max_concurrent, args.verbose
+    )
+    print(f"🤖 Serveur BD-1 prêt sur http://{args.host}:{server.server_address[1]} ({len(bank)} sons)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.synthesizer.close()